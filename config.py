@@ -1,45 +1,80 @@
-from pydantic_settings import BaseSettings
+import os
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Optional
+from typing import Any, Callable, Optional
 
-class Settings(BaseSettings):
+from dotenv import load_dotenv
+
+# Populate os.environ from .env once; real environment variables win (Railway)
+load_dotenv(".env", override=False, encoding="utf-8")
+
+_MISSING = object()
+
+def _to_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _env(name: str, default: Any = _MISSING, cast: Callable[[str], Any] = str) -> Any:
+    """Read a setting from the environment, raising if a required one is unset"""
+    value = os.environ.get(name)
+    if value is None:
+        if default is _MISSING:
+            raise ValueError(f"{name} environment variable is required")
+        return default
+    return cast(value)
+
+# Optional secrets resolved on first attribute access rather than at startup
+_LAZY_KEYS = frozenset({
+    "TWILIO_ACCOUNT_SID",
+    "TWILIO_AUTH_TOKEN",
+    "TWILIO_PHONE_NUMBER",
+})
+
+@lru_cache(maxsize=None)
+def _lazy_env(name: str) -> Optional[str]:
+    # Cached here because the slotted, frozen Settings cannot memoize on itself
+    return os.environ.get(name)
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     # Database
-    DATABASE_URL: str
-    
+    DATABASE_URL: str = field(default_factory=lambda: _env("DATABASE_URL"))
+
     # Security
-    SECRET_KEY: str
-    ALGORITHM: str = "HS256"
-    
+    SECRET_KEY: str = field(default_factory=lambda: _env("SECRET_KEY"))
+    ALGORITHM: str = field(default_factory=lambda: _env("ALGORITHM", "HS256"))
+
     # Face Recognition
-    FACE_RECOGNITION_ENABLED: bool = True
-    FACE_CONFIDENCE_THRESHOLD: float = 0.6
-    FACE_STORAGE_PATH: str = "storage/faces"
-    
+    FACE_RECOGNITION_ENABLED: bool = field(default_factory=lambda: _env("FACE_RECOGNITION_ENABLED", True, _to_bool))
+    FACE_CONFIDENCE_THRESHOLD: float = field(default_factory=lambda: _env("FACE_CONFIDENCE_THRESHOLD", 0.6, float))
+    FACE_STORAGE_PATH: str = field(default_factory=lambda: _env("FACE_STORAGE_PATH", "storage/faces"))
+
     # GPS Configuration
-    GPS_GEOFENCE_RADIUS_KM: float = 5.0
-    FARM_LATITUDE: float = 8.430153784606453
-    FARM_LONGITUDE: float = 77.42507404406288
-    PROCESSING_UNIT_LATITUDE: float = 8.097457521754535
-    PROCESSING_UNIT_LONGITUDE: float = 77.550169800994
-    
-    # Twilio
-    TWILIO_ACCOUNT_SID: Optional[str] = None
-    TWILIO_AUTH_TOKEN: Optional[str] = None
-    TWILIO_PHONE_NUMBER: Optional[str] = None
-    
+    GPS_GEOFENCE_RADIUS_KM: float = field(default_factory=lambda: _env("GPS_GEOFENCE_RADIUS_KM", 5.0, float))
+    FARM_LATITUDE: float = field(default_factory=lambda: _env("FARM_LATITUDE", 8.430153784606453, float))
+    FARM_LONGITUDE: float = field(default_factory=lambda: _env("FARM_LONGITUDE", 77.42507404406288, float))
+    PROCESSING_UNIT_LATITUDE: float = field(default_factory=lambda: _env("PROCESSING_UNIT_LATITUDE", 8.097457521754535, float))
+    PROCESSING_UNIT_LONGITUDE: float = field(default_factory=lambda: _env("PROCESSING_UNIT_LONGITUDE", 77.550169800994, float))
+
     # API Configuration
-    API_VERSION: str = "v1"
-    API_PREFIX: str = "/api"
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
-        # Allow extra fields for Railway compatibility
-        extra = "ignore"
-
-@lru_cache()
-def get_settings():
-    return Settings()
-
-settings = get_settings()
\ No newline at end of file
+    API_VERSION: str = field(default_factory=lambda: _env("API_VERSION", "v1"))
+    API_PREFIX: str = field(default_factory=lambda: _env("API_PREFIX", "/api"))
+
+    def __getattr__(self, name: str) -> Optional[str]:
+        # Optional integration secrets (Twilio) are not read until first use
+        if name in _LAZY_KEYS:
+            return _lazy_env(name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+settings: Settings = Settings()
+
+def get_settings() -> Settings:
+    return settings
+
+# Hot-path scalars bound once at import so request handlers read plain globals
+FACE_CONFIDENCE_THRESHOLD: float = settings.FACE_CONFIDENCE_THRESHOLD
+FACE_STORAGE_PATH: str = settings.FACE_STORAGE_PATH
+GEOFENCE_RADIUS_KM: float = settings.GPS_GEOFENCE_RADIUS_KM
+FARM_LAT: float = settings.FARM_LATITUDE
+FARM_LON: float = settings.FARM_LONGITUDE
+PROCESSING_UNIT_LAT: float = settings.PROCESSING_UNIT_LATITUDE
+PROCESSING_UNIT_LON: float = settings.PROCESSING_UNIT_LONGITUDE
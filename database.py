@@ -1,14 +1,15 @@
 import os
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Generator
+from typing import AsyncIterator, Generator, List, Optional
 import asyncpg
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Database URL from environment variables
@@ -18,45 +19,82 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
 
 # Create SQLAlchemy engine
+# psycopg2 sends parameters client-side and never issues server-side PREPAREs,
+# so unlike the asyncpg pool below it needs no statement-cache tweaks to run
+# behind PgBouncer/Supavisor in transaction pooling mode.
 try:
     engine = create_engine(
         DATABASE_URL,
         pool_size=10,
         max_overflow=20,
-        pool_pre_ping=True,
+        # LIFO keeps a small hot set of connections in use; under overload
+        # fail after 10s instead of queueing behind the pool indefinitely
+        pool_use_lifo=True,
+        pool_timeout=10,
+        # No per-checkout SELECT 1: pool_recycle rotates connections before
+        # typical LB idle cut-offs and TCP keepalives surface dead peers
+        pool_pre_ping=False,
         pool_recycle=300,
+        connect_args={
+            "keepalives": 1,
+            "keepalives_idle": 30,
+            "keepalives_interval": 10,
+            "keepalives_count": 5,
+        },
         echo=False
     )
     logger.info("✅ SQLAlchemy engine initialized")
 except Exception as e:
-    logger.error(f"❌ Failed to initialize database engine: {str(e)}")
+    logger.error("❌ Failed to initialize database engine: %s", e)
     raise
 
+# Liveness probe statement, built once and reused by every health check
+HEALTH_CHECK_QUERY = text("SELECT 1")
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only sessions run on the same pool in AUTOCOMMIT mode, so GET handlers
+# skip the BEGIN/ROLLBACK pair a transactional session issues per request
+ReadOnlySessionLocal = sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine.execution_options(isolation_level="AUTOCOMMIT")
+)
+
 # Create Base class for models
 Base = declarative_base()
 
-# Supabase client for routes that need it
-try:
-    from supabase import create_client, Client
+# Supabase client for routes that need it; built on first use, not at import
+@lru_cache(maxsize=1)
+def get_supabase_client():
+    """
+    Return the shared Supabase client, or None if it is not configured.
+    """
+    try:
+        from supabase import create_client
+    except ImportError:
+        logger.warning("⚠️ Supabase library not installed")
+        return None
+    
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = (
+        os.getenv("SUPABASE_ANON_KEY")
+        or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        or os.getenv("SUPABASE_SERVICE_KEY")
+    )
     
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not (supabase_url and supabase_key):
+        logger.warning("⚠️ Supabase credentials not found, client not initialized")
+        return None
     
-    if SUPABASE_URL and SUPABASE_KEY:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    try:
+        client = create_client(supabase_url, supabase_key)
         logger.info("✅ Supabase client initialized")
-    else:
-        logger.warning("⚠️ Supabase credentials not found, client not initialized")
-        supabase = None
-except ImportError:
-    logger.warning("⚠️ Supabase library not installed")
-    supabase = None
-except Exception as e:
-    logger.error(f"❌ Failed to initialize Supabase client: {str(e)}")
-    supabase = None
+        return client
+    except Exception as e:
+        logger.error("❌ Failed to initialize Supabase client: %s", e)
+        return None
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -70,31 +108,195 @@ def get_db() -> Generator[Session, None, None]:
     try:
         yield db
     except SQLAlchemyError as e:
-        logger.error(f"Database session error: {str(e)}")
+        logger.error("Database session error: %s", e)
         db.rollback()
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in database session: {str(e)}")
+        logger.error("Unexpected error in database session: %s", e)
         db.rollback()
         raise
     finally:
         db.close()
 
-async def get_db_connection():
+def get_readonly_db() -> Generator[Session, None, None]:
     """
-    Get raw database connection for complex queries.
+    Database dependency for read-only endpoints.
+    Use get_db for handlers that add, update or delete rows.
+    
+    Yields:
+        Session: SQLAlchemy session on an AUTOCOMMIT connection
+    """
+    db = ReadOnlySessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Shared asyncpg pool for raw-SQL routes; pre-warmed at startup by the lifespan
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "5"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+async def init_db_pool() -> asyncpg.Pool:
+    """
+    Create the shared asyncpg connection pool (idempotent).
     Disables prepared statement caching to ensure compatibility with PgBouncer
     in transaction or statement pooling mode (e.g., on Railway).
     """
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = await asyncpg.create_pool(
+                    DATABASE_URL,
+                    min_size=DB_POOL_MIN,
+                    max_size=DB_POOL_MAX,
+                    max_inactive_connection_lifetime=300,
+                    statement_cache_size=0,  # ✅ CRITICAL FIX: Disable prepared statement caching
+                    server_settings={
+                        # Short OLTP queries never recoup JIT compile time
+                        "jit": "off",
+                        # Lets pg_stat_activity attribute connections to this service
+                        "application_name": "relishagro-backend",
+                    }
+                )
+                logger.info("✅ asyncpg connection pool initialized")
+            except Exception as e:
+                logger.error("❌ Failed to create database pool: %s", e)
+                raise
+    return _pool
+
+async def close_db_pool() -> None:
+    """Close the shared asyncpg pool, if one was created"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("✅ asyncpg connection pool closed")
+
+@asynccontextmanager
+async def get_db_connection(timeout: Optional[float] = None) -> AsyncIterator[asyncpg.Connection]:
+    """
+    Borrow a raw database connection from the pool for complex queries.
+    The connection is released back to the pool when the block exits.
+    
+    Usage:
+        async with get_db_connection() as conn:
+            rows = await conn.fetch(query)
+    
+    Args:
+        timeout: Seconds to wait for a free connection (asyncio.TimeoutError on expiry)
+    """
+    pool = await init_db_pool()
+    conn = await pool.acquire(timeout=timeout)
     try:
-        conn = await asyncpg.connect(
-            DATABASE_URL,
-            statement_cache_size=0  # ✅ CRITICAL FIX: Disable prepared statement caching
-        )
-        return conn
-    except Exception as e:
-        logger.error(f"Failed to create database connection: {str(e)}")
-        raise
+        yield conn
+    finally:
+        await pool.release(conn)
+
+async def execute_many(query: str, rows: List[tuple], timeout: Optional[float] = None) -> None:
+    """
+    Run one statement for many parameter tuples in a single pipelined batch.
+    
+    Args:
+        query: SQL with $1..$n placeholders
+        rows: One parameter tuple per execution
+        timeout: Optional statement timeout in seconds
+    """
+    if not rows:
+        return
+    async with get_db_connection() as conn:
+        await conn.executemany(query, rows, timeout=timeout)
+
+class WriteBatcher:
+    """
+    Coalesce single-row INSERTs from concurrent requests into one executemany.
+    
+    submit() resolves only after its row is written (or raises that row's
+    error; a failed batch is retried row by row), so handlers keep
+    write-before-respond semantics. The flusher task starts lazily inside the worker's event loop.
+    
+    Usage:
+        gps_writes = WriteBatcher("INSERT INTO t (a, b) VALUES ($1, $2)")
+        await gps_writes.submit((a, b))
+    
+    Args:
+        query: SQL with $1..$n placeholders
+        max_batch: Most rows written per round-trip
+        max_delay: Seconds to wait for more rows before flushing a partial batch
+    """
+    
+    def __init__(self, query: str, max_batch: int = 32, max_delay: float = 0.005):
+        self.query = query
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def submit(self, row: tuple) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._flush_forever())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        await future
+    
+    async def _flush_forever(self) -> None:
+        queue = self._queue
+        batch = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                if queue.qsize() < self.max_batch - 1:
+                    await asyncio.sleep(self.max_delay)
+                while len(batch) < self.max_batch and not queue.empty():
+                    batch.append(queue.get_nowait())
+                
+                await self._write(batch)
+                batch = []
+        finally:
+            # submit() starts a fresh task with a fresh queue if this one
+            # dies; fail everything it still holds rather than strand callers
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Write batcher stopped before writing row"))
+    
+    async def _write(self, batch: List[tuple]) -> None:
+        try:
+            await execute_many(self.query, [row for row, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _settle(batch[0][1], e)
+                return
+            # executemany is atomic, so one bad row fails the whole batch;
+            # retry row by row so each caller gets its own row's outcome
+            for row, future in batch:
+                try:
+                    await execute_many(self.query, [row])
+                except Exception as row_error:
+                    _settle(future, row_error)
+                else:
+                    _settle(future, None)
+        else:
+            for _, future in batch:
+                _settle(future, None)
+
+def _settle(future: asyncio.Future, error: Optional[BaseException]) -> None:
+    # The submitting request may have been cancelled meanwhile
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+# Last known result of test_connection(); None until the first probe runs
+_healthy: Optional[bool] = None
 
 def test_connection() -> bool:
     """
@@ -103,15 +305,28 @@ def test_connection() -> bool:
     Returns:
         bool: True if connection successful, False otherwise
     """
+    global _healthy
     try:
         with engine.connect() as connection:
-            result = connection.execute(text("SELECT 1"))
-            logger.info("✅ Database connection test successful")
+            result = connection.execute(HEALTH_CHECK_QUERY)
+            logger.debug("✅ Database connection test successful")
+            _healthy = True
             return True
     except Exception as e:
-        logger.error(f"❌ Database connection test failed: {str(e)}")
+        logger.error("❌ Database connection test failed: %s", e)
+        _healthy = False
         return False
 
+def check_database_health() -> bool:
+    """
+    Return the cached database health, probing only if no check has run yet.
+    The startup lifespan runs the probe once per process, so this normally
+    never touches the database.
+    """
+    if _healthy is None:
+        return test_connection()
+    return _healthy
+
 def init_db():
     """
     Initialize database tables (if needed)
@@ -125,15 +340,5 @@ def init_db():
         Base.metadata.create_all(bind=engine)
         logger.info("✅ Database tables initialized")
     except Exception as e:
-        logger.error(f"❌ Failed to initialize database tables: {str(e)}")
+        logger.error("❌ Failed to initialize database tables: %s", e)
         raise
-
-# Test connection on module import
-if __name__ == "__main__":
-    test_connection()
-else:
-    # Test connection when imported
-    try:
-        test_connection()
-    except Exception as e:
-        logger.warning(f"Database connection test failed on import: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""
+RelishAgro Backend - Gunicorn configuration
+Runs the FastAPI app under gunicorn's process supervision with uvicorn
+workers forked from a preloaded master: gunicorn main:app -c gunicorn.conf.py
+"""
+
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+# One uvicorn worker per core: each runs an event loop that overlaps its own
+# DB waits, so the sync-worker 2 * cores + 1 rule would only add processes.
+# Connection budget per worker: asyncpg pool DB_POOL_MIN..DB_POOL_MAX (5..20,
+# the minimum opened at boot) plus SQLAlchemy pool_size + max_overflow
+# (10 + 20), i.e. up to 50. Keep WEB_CONCURRENCY * 50 under the
+# PgBouncer/Supabase connection limit when overriding on Railway.
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "server_worker.RelishAgroWorker"
+
+# Import the app (routers, OpenCV cascades) once in the master and fork;
+# workers share those pages copy-on-write and boot faster
+preload_app = True
+
+# Bounded accept queue; keepalive reaches uvicorn as timeout_keep_alive.
+# The per-worker request cap and loop/parser choice live in server_worker.
+backlog = 2048
+keepalive = 30
+
+# Heartbeat files on tmpfs so a slow container disk can't stall workers
+worker_tmp_dir = "/dev/shm"
+
+def post_fork(server, worker):
+    # The preloaded engine's pool must not hand a forked worker sockets the
+    # master opened; drop them without closing the parent's connections
+    from database import engine
+    engine.dispose(close=False)
@@ -0,0 +1,68 @@
+"""
+RelishAgro Backend - Logging setup
+Configures the root logger once per process; LOG_LEVEL selects the level
+(WARNING by default so request-path INFO logs cost nothing in production).
+Records are handed to a queue and written to stderr by a background thread,
+so request handlers never block on the write() syscall.
+"""
+
+import os
+import atexit
+import queue
+import logging
+import logging.handlers
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+def setup_logging() -> None:
+    """Install the root handler once; repeat calls are no-ops"""
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+    # Threads do not survive fork(): a preloaded gunicorn master's children
+    # need their own queue and writer thread
+    os.register_at_fork(after_in_child=_restart_listener)
+
+    # QueueHandler pre-renders the message (and any traceback) before
+    # enqueueing; the listener's handler applies LOG_FORMAT around it
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "WARNING").upper(),
+        handlers=[_queue_handler]
+    )
+
+def _restart_listener() -> None:
+    # A fresh queue, so records the parent had not yet written are not
+    # written a second time by the child
+    global _listener
+    if _listener is not None:
+        log_queue = queue.SimpleQueue()
+        _queue_handler.queue = log_queue
+        _listener = logging.handlers.QueueListener(
+            log_queue, *_listener.handlers, respect_handler_level=True
+        )
+        _listener.start()
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -5,49 +5,70 @@ Enhanced CORS configuration for mobile browser compatibility
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from contextlib import asynccontextmanager
+import asyncio
+import importlib
 import logging
+import os
+import orjson
 import uvicorn
-from datetime import datetime
-
-# Import database and routes
-from database import init_db, test_connection
-from routes import (
-    auth, 
-    admin, 
-    workers, 
-    job_types, 
-    provisions, 
-    onboarding, 
-    attendance, 
-    face_recognition, 
-    face_integration,  # ✅ ADDED
-    gps_tracking, 
-    supervisor, 
-    yields
-)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging before any module grabs a logger
+from logging_config import setup_logging
+setup_logging()
+
+# Import database
+from database import init_db, test_connection, check_database_health, init_db_pool, close_db_pool
+from utils.clock import now_iso
+from utils.middleware import HealthCheckMiddleware, PlainTextJSONMiddleware, TimingMiddleware
+from utils.staff_ids import ensure_staff_id_counters
+
 logger = logging.getLogger(__name__)
 
+# Run Base.metadata.create_all() at startup (off unless RUN_DDL=1)
+RUN_DDL = os.getenv("RUN_DDL") == "1"
+
+# Seconds between background database probes feeding /health
+DB_PROBE_INTERVAL = 10
+
+async def _probe_db():
+    # test_connection() records its result for check_database_health()
+    while True:
+        await asyncio.sleep(DB_PROBE_INTERVAL)
+        await asyncio.to_thread(test_connection)
+
+async def _warm_pool():
+    # Open the asyncpg pool's min_size connections before serving traffic
+    try:
+        await init_db_pool()
+    except Exception as e:
+        logger.error("❌ Database pool pre-warm failed, will retry on first use: %s", e)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 RelishAgro Backend Starting...")
+    logger.info("Event loop: %s", type(asyncio.get_running_loop()).__module__)
     
     try:
-        # Initialize database
-        logger.info("📊 Initializing database...")
-        init_db()
+        # Schema creation is opt-in so N workers don't all run DDL on boot;
+        # set RUN_DDL=1 for a single release/first-deploy process
+        startup = [asyncio.to_thread(test_connection), _warm_pool()]
+        if RUN_DDL:
+            logger.info("📊 Initializing database...")
+            startup.append(asyncio.to_thread(init_db))
+        else:
+            # The staff ID counter table postdates existing deployments;
+            # create just that one (IF NOT EXISTS) on every boot
+            startup.append(asyncio.to_thread(ensure_staff_id_counters))
         
-        # Test database connection
+        # Connection test, pool pre-warm and DDL overlap instead of running
+        # back to back; the sync calls stay off the event loop
         logger.info("🔍 Testing database connection...")
-        if test_connection():
+        db_ok, *_ = await asyncio.gather(*startup)
+        if db_ok:
             logger.info("✅ Database connection successful")
         else:
             logger.error("❌ Database connection failed")
@@ -55,100 +76,209 @@ async def lifespan(app: FastAPI):
         logger.info("✅ Backend startup completed successfully")
         
     except Exception as e:
-        logger.error(f"❌ Startup error: {str(e)}")
+        logger.error("❌ Startup error: %s", e)
         raise e
     
+    background_tasks = [
+        asyncio.create_task(_probe_db()),
+    ]
+    
     yield
     
     # Shutdown
     logger.info("🛑 RelishAgro Backend Shutting Down...")
+    for task in background_tasks:
+        task.cancel()
+    await close_db_pool()
+
+# Interactive docs and the OpenAPI schema are not served in production
+IS_PROD = os.getenv("ENVIRONMENT", "").lower() == "production"
+DOCS_URL = None if IS_PROD else "/docs"
 
 # Create FastAPI app
 app = FastAPI(
     title="RelishAgro Backend API",
     description="Complete RelishAgro management system with mobile compatibility and face recognition",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+    docs_url=DOCS_URL,
+    redoc_url=None if IS_PROD else "/redoc",
+    openapi_url=None if IS_PROD else "/openapi.json"
+)
+
+# Static response bodies, serialized once at import
+_ROOT_BYTES = orjson.dumps({
+    "message": "RelishAgro Backend API",
+    "version": "1.0.0",
+    "status": "running",
+    "docs": DOCS_URL,
+    "features": ["Face Recognition", "Attendance", "GPS Tracking", "Onboarding"]
+})
+_INTERNAL_ERROR_BYTES = orjson.dumps({"detail": "Internal server error"})
+
+def _health_parts(healthy: bool) -> tuple:
+    # Serialized health body split around the timestamp, the only dynamic field
+    body = orjson.dumps({
+        "status": "healthy" if healthy else "unhealthy",
+        "timestamp": "@@",
+        "database": "connected" if healthy else "disconnected",
+        "version": "1.0.0"
+    })
+    return tuple(body.split(b"@@"))
+
+_HEALTH_PARTS = {True: _health_parts(True), False: _health_parts(False)}
+
+def _health_body(healthy: bool) -> bytes:
+    head, tail = _HEALTH_PARTS[healthy]
+    return head + now_iso().encode() + tail
+
+# Short shared-cache lifetime for the static root document; health checks
+# must never be answered from a cache
+PUBLIC_CACHE_HEADERS = {"Cache-Control": "public, max-age=5"}
+NO_CACHE_HEADERS = {"Cache-Control": "no-store"}
+
+# Answer /health probes from the ASGI layer, inside CORS but ahead of
+# routing and the exception middleware
+app.add_middleware(
+    HealthCheckMiddleware,
+    path="/health",
+    render=lambda: _health_body(check_database_health()),
+    headers=[(k.lower().encode(), v.encode()) for k, v in NO_CACHE_HEADERS.items()]
 )
 
+# Exact origins, checked with a set lookup (CORSMiddleware uses `in`)
+ALLOWED_ORIGINS = frozenset({
+    "https://relishagro.vercel.app",
+    "http://localhost:3000",
+    "http://localhost:5173",
+    "http://127.0.0.1:3000",
+    "http://127.0.0.1:5173",
+    "https://localhost:3000",
+    "https://127.0.0.1:3000",
+})
+
+# Seconds browsers may cache a preflight response; production sets the same
+# value explicitly in railway.toml
+PREFLIGHT_MAX_AGE = int(os.getenv("PREFLIGHT_MAX_AGE", "7200"))
+
 # ENHANCED CORS Configuration for Mobile Compatibility
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "https://relishagro.vercel.app",
-        "http://localhost:3000",
-        "http://localhost:5173",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:5173",
-        "https://localhost:3000",
-        "https://127.0.0.1:3000",
-        "*"
-    ],
+    allow_origins=ALLOWED_ORIGINS,
+    # Our Vercel preview deployments and any local dev port; an explicit match
+    # lets credentialed requests get their origin echoed back, which a bare
+    # "*" next to allow_credentials=True does not satisfy in browsers
+    allow_origin_regex=r"https://relishagro(-[a-z0-9-]+)?\.vercel\.app|https?://(localhost|127\.0\.0\.1)(:\d+)?",
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["*"]
+    # Only what the frontend actually sends; Starlette always adds the
+    # CORS-safelisted ones (Accept, Accept-Language, Content-Language)
+    allow_headers=("Authorization", "Content-Type"),
+    expose_headers=["*"],
+    # Cache preflight results for 2 hours instead of 10 minutes; Chromium
+    # clamps anything longer to 7200 anyway (Firefox allows up to 86400)
+    max_age=PREFLIGHT_MAX_AGE
 )
 
-# Add mobile-specific middleware
-@app.middleware("http")
-async def mobile_compatibility_middleware(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["Access-Control-Allow-Origin"] = "*"
-    response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
-    response.headers["Access-Control-Allow-Headers"] = "*"
-    return response
+# Accept JSON posted as text/plain on login so it can skip the CORS
+# preflight; authenticated routes are preflighted for Authorization anyway
+app.add_middleware(PlainTextJSONMiddleware, paths=("/api/auth/login",))
+
+# Compress larger JSON bodies for mobile clients; small payloads like
+# /health stay under minimum_size and skip compression
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
+# Opt-in latency header for profiling; outermost so it covers the whole stack
+if os.getenv("REQUEST_TIMING") == "1":
+    app.add_middleware(TimingMiddleware)
 
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"❌ Global exception: {str(exc)}")
-    return JSONResponse(
+    logger.error("❌ Global exception: %s", exc)
+    return Response(
+        content=_INTERNAL_ERROR_BYTES,
         status_code=500,
-        content={"detail": "Internal server error"}
+        media_type="application/json"
     )
 
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    db_status = test_connection()
-    return {
-        "status": "healthy" if db_status else "unhealthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "database": "connected" if db_status else "disconnected",
-        "version": "1.0.0"
-    }
+# Status endpoints take no parameters and return pre-serialized bytes, so
+# they are plain Starlette routes: no dependency solving or response
+# validation, and they stay out of the OpenAPI schema. /health itself is
+# served by HealthCheckMiddleware above.
+
+# Uncached health check for CI and on-demand verification
+async def deep_health_check(request: Request) -> Response:
+    db_status = await asyncio.to_thread(test_connection)
+    return Response(content=_health_body(db_status), media_type="application/json", headers=NO_CACHE_HEADERS)
 
 # Root endpoint
-@app.get("/")
-async def root():
-    return {
-        "message": "RelishAgro Backend API",
-        "version": "1.0.0",
-        "status": "running",
-        "docs": "/docs",
-        "features": ["Face Recognition", "Attendance", "GPS Tracking", "Onboarding"]
-    }
+async def root(request: Request) -> Response:
+    return Response(content=_ROOT_BYTES, media_type="application/json", headers=PUBLIC_CACHE_HEADERS)
+
+app.add_route("/health/deep", deep_health_check, methods=["GET"], include_in_schema=False)
+app.add_route("/", root, methods=["GET"], include_in_schema=False)
 
 # ✅ COMPLETE ROUTER REGISTRATION
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(admin.router, prefix="/api", tags=["Admin"])
-app.include_router(workers.router, prefix="/api/workers", tags=["Workers"])
-app.include_router(job_types.router, prefix="/api", tags=["Job Types"])
-app.include_router(provisions.router, prefix="/api/provisions", tags=["Provisions"])
-app.include_router(onboarding.router, prefix="/api/onboarding", tags=["Onboarding"])
-app.include_router(attendance.router, prefix="/api", tags=["Attendance"])
-app.include_router(face_recognition.router, prefix="/api", tags=["Face Recognition"])
-app.include_router(face_integration.router, tags=["Face Integration"])  # ✅ ADDED - No prefix, uses internal prefix
-app.include_router(gps_tracking.router, prefix="/api", tags=["GPS Tracking"])
-app.include_router(supervisor.router, prefix="/api", tags=["Supervisor"])
-app.include_router(yields.router, prefix="/api", tags=["Yields"])
+# (module under routes/, prefix, tag); face_integration carries its own prefix
+ROUTERS = (
+    ("auth", "/api/auth", "Authentication"),
+    ("admin", "/api", "Admin"),
+    # Before workers: /api/workers/available must precede /api/workers/{staff_id}
+    ("supervisor", "/api", "Supervisor"),
+    ("workers", "/api/workers", "Workers"),
+    ("job_types", "/api", "Job Types"),
+    ("provisions", "/api/provisions", "Provisions"),
+    ("onboarding", "/api/onboarding", "Onboarding"),
+    ("attendance", "/api", "Attendance"),
+    ("face_recognition", "/api", "Face Recognition"),
+    ("face_integration", "", "Face Integration"),
+    ("gps_tracking", "/api", "GPS Tracking"),
+    ("yields", "/api", "Yields"),
+)
+
+# A router that fails to import aborts startup rather than serving a
+# partial API; import every module first, then register them in one pass
+router_modules = {name: importlib.import_module(f"routes.{name}") for name, _, _ in ROUTERS}
+
+for name, prefix, tag in ROUTERS:
+    app.include_router(router_modules[name].router, prefix=prefix, tags=[tag])
+
+# Starlette matches routes first-to-last, so a repeated method + path, or a
+# literal path that an earlier parameterized one already matches (e.g.
+# /lots/enhanced behind /lots/{lot_id}), silently shadows the later
+# handler; refuse to start with one
+_seen_routes = []
+for route in app.router.routes:
+    methods = getattr(route, "methods", None)
+    if not methods:
+        continue
+    is_literal = "{" not in route.path
+    for seen_methods, seen_path, seen_regex in _seen_routes:
+        if methods & seen_methods and (
+            seen_path == route.path or (is_literal and seen_regex.match(route.path))
+        ):
+            raise RuntimeError(f"Route {route.path} is shadowed by earlier route {seen_path}")
+    _seen_routes.append((methods, route.path, route.path_regex))
+
+logger.info("Loaded routers: %s", list(router_modules))
 
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
-        port=8080,
+        port=int(os.getenv("PORT", "8080")),
         reload=False,
-        log_level="info"
+        log_level="info",
+        access_log=False,
+        # uvloop + httptools ship with uvicorn[standard]
+        loop="uvloop",
+        http="httptools",
+        # One worker per core, matching gunicorn.conf.py and start.py
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        # Answer 503 past the cap instead of piling up behind the DB pool
+        limit_concurrency=int(os.getenv("LIMIT_CONCURRENCY", "1000")),
+        timeout_keep_alive=30,
+        backlog=2048
     )
\ No newline at end of file
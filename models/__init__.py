@@ -10,10 +10,11 @@ from .onboarding import OnboardingRequest
 from .rfid import RFIDTag
 from .work_timing import WorkTiming
 from .job_type import DailyJobType
+from .staff_id_counter import StaffIdCounter
 
 __all__ = [
     "PersonRecord", "AttendanceLog", "Lot", "Dispatch", "GPSTrackingLog",
     "GeofenceAlert", "FlavorCoreProcessing", "QRLabel", "ProvisionRequest",
     "Notification", "AuditLog", "OnboardingRequest", "RFIDTag", "WorkTiming",
-    "DailyJobType"
+    "DailyJobType", "StaffIdCounter"
 ]
\ No newline at end of file
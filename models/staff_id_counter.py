@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Text, Integer
+from database import Base
+
+class StaffIdCounter(Base):
+    """Last issued sequence number per staff ID prefix and day, e.g. STF-250101"""
+    __tablename__ = "staff_id_counters"
+
+    key = Column(Text, primary_key=True)
+    last_n = Column(Integer, nullable=False)
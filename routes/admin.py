@@ -6,8 +6,10 @@ Complete admin functionality with correct model imports
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func, and_, or_
-from database import get_db
+from sqlalchemy import func, and_, or_
+from database import get_db, get_readonly_db, HEALTH_CHECK_QUERY
+from utils.clock import now_iso
+from utils import invalidate_user
 from models.person import PersonRecord  # FIXED: Changed from models.person_record to models.person
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
@@ -89,7 +91,7 @@ def generate_staff_id(role: str, first_name: str, last_name: str) -> str:
 # Routes
 
 @router.get("/admin/stats", response_model=AdminStats)
-async def get_admin_stats(db: Session = Depends(get_db)):
+def get_admin_stats(db: Session = Depends(get_readonly_db)):
     """Get comprehensive admin statistics"""
     try:
         # Total users
@@ -134,19 +136,19 @@ async def get_admin_stats(db: Session = Depends(get_db)):
         )
         
     except Exception as e:
-        logging.error(f"Error getting admin stats: {str(e)}")
+        logging.error("Error getting admin stats: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve admin statistics: {str(e)}"
         )
 
 @router.get("/admin/users", response_model=AdminUserResponse)
-async def get_all_users(
+def get_all_users(
     page: int = 1,
     per_page: int = 20,
     role: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_readonly_db)
 ):
     """Get all users with pagination and filtering"""
     try:
@@ -201,14 +203,14 @@ async def get_all_users(
         )
         
     except Exception as e:
-        logging.error(f"Error getting users: {str(e)}")
+        logging.error("Error getting users: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve users: {str(e)}"
         )
 
 @router.get("/admin/users/{staff_id}")
-async def get_user_by_id(staff_id: str, db: Session = Depends(get_db)):
+def get_user_by_id(staff_id: str, db: Session = Depends(get_readonly_db)):
     """Get specific user by staff_id"""
     try:
         user = db.query(PersonRecord).filter(PersonRecord.staff_id == staff_id).first()
@@ -233,14 +235,14 @@ async def get_user_by_id(staff_id: str, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error getting user {staff_id}: {str(e)}")
+        logging.error("Error getting user %s: %s", staff_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve user: {str(e)}"
         )
 
 @router.post("/admin/users", status_code=status.HTTP_201_CREATED)
-async def create_user(user_data: UserCreateRequest, db: Session = Depends(get_db)):
+def create_user(user_data: UserCreateRequest, db: Session = Depends(get_db)):
     """Create new user"""
     try:
         # Check if staff_id already exists
@@ -276,14 +278,14 @@ async def create_user(user_data: UserCreateRequest, db: Session = Depends(get_db
         raise
     except Exception as e:
         db.rollback()
-        logging.error(f"Error creating user: {str(e)}")
+        logging.error("Error creating user: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create user: {str(e)}"
         )
 
 @router.put("/admin/users/{staff_id}")
-async def update_user(
+def update_user(
     staff_id: str, 
     user_update: UserUpdateRequest, 
     db: Session = Depends(get_db)
@@ -307,10 +309,11 @@ async def update_user(
         # Note: Role change would require changing staff_id, which is complex
         # For now, just log the request
         if user_update.role is not None:
-            logging.info(f"Role change requested for {staff_id} to {user_update.role}")
+            logging.info("Role change requested for %s to %s", staff_id, user_update.role)
         
         db.commit()
         db.refresh(user)
+        invalidate_user(staff_id)
         
         return {
             "message": "User updated successfully",
@@ -324,14 +327,14 @@ async def update_user(
         raise
     except Exception as e:
         db.rollback()
-        logging.error(f"Error updating user {staff_id}: {str(e)}")
+        logging.error("Error updating user %s: %s", staff_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update user: {str(e)}"
         )
 
 @router.delete("/admin/users/{staff_id}")
-async def delete_user(staff_id: str, db: Session = Depends(get_db)):
+def delete_user(staff_id: str, db: Session = Depends(get_db)):
     """Delete user (soft delete by setting inactive)"""
     try:
         user = db.query(PersonRecord).filter(PersonRecord.staff_id == staff_id).first()
@@ -345,6 +348,7 @@ async def delete_user(staff_id: str, db: Session = Depends(get_db)):
         # For now, actually delete. In production, you might want soft delete
         db.delete(user)
         db.commit()
+        invalidate_user(staff_id)
         
         return {
             "message": f"User {staff_id} deleted successfully"
@@ -354,32 +358,32 @@ async def delete_user(staff_id: str, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         db.rollback()
-        logging.error(f"Error deleting user {staff_id}: {str(e)}")
+        logging.error("Error deleting user %s: %s", staff_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete user: {str(e)}"
         )
 
 @router.get("/admin/system/health")
-async def get_system_health(db: Session = Depends(get_db)):
+def get_system_health(db: Session = Depends(get_readonly_db)):
     """Get system health status"""
     try:
         # Test database connection
-        db.execute(text("SELECT 1"))
+        db.execute(HEALTH_CHECK_QUERY)
         
         return {
             "status": "healthy",
             "database": "connected",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now_iso(),
             "version": "1.0.0"
         }
         
     except Exception as e:
-        logging.error(f"System health check failed: {str(e)}")
+        logging.error("System health check failed: %s", e)
         return {
             "status": "unhealthy",
             "database": "disconnected",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now_iso(),
             "error": str(e)
         }
 
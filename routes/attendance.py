@@ -28,48 +28,46 @@ async def check_in_attendance(
 ):
     """Record attendance check-in"""
     try:
-        conn = await get_db_connection()
-        
-        # Check if person is already checked in today
-        existing_checkin_query = """
-        SELECT id, timestamp 
-        FROM attendance_logs 
-        WHERE person_id = $1 
-        AND timestamp >= CURRENT_DATE 
-        AND check_out_time IS NULL
-        """
-        existing = await conn.fetchrow(
-            existing_checkin_query, 
-            uuid.UUID(attendance_data.person_id)
-        )
-        
-        if existing:
-            await conn.close()
-            raise HTTPException(
-                status_code=400,
-                detail="Person is already checked in today"
+        async with get_db_connection() as conn:
+        
+            # Check if person is already checked in today
+            existing_checkin_query = """
+            SELECT id, timestamp 
+            FROM attendance_logs 
+            WHERE person_id = $1 
+            AND timestamp >= CURRENT_DATE 
+            AND check_out_time IS NULL
+            """
+            existing = await conn.fetchrow(
+                existing_checkin_query, 
+                uuid.UUID(attendance_data.person_id)
+            )
+        
+            if existing:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Person is already checked in today"
+                )
+        
+            # Create attendance record
+            query = """
+            INSERT INTO attendance_logs (
+                person_id, method, location, status, timestamp, recorded_by
+            ) VALUES ($1, $2, $3, $4, $5, $6)
+            RETURNING id, timestamp
+            """
+        
+            now = datetime.now()
+            row = await conn.fetchrow(
+                query,
+                uuid.UUID(attendance_data.person_id),
+                attendance_data.method,
+                attendance_data.location,
+                attendance_data.status,
+                now,
+                uuid.UUID(current_user.id)  # This matches UserProfile.id which is a string
             )
         
-        # Create attendance record
-        query = """
-        INSERT INTO attendance_logs (
-            person_id, method, location, status, timestamp, recorded_by
-        ) VALUES ($1, $2, $3, $4, $5, $6)
-        RETURNING id, timestamp
-        """
-        
-        now = datetime.now()
-        row = await conn.fetchrow(
-            query,
-            uuid.UUID(attendance_data.person_id),
-            attendance_data.method,
-            attendance_data.location,
-            attendance_data.status,
-            now,
-            uuid.UUID(current_user.id)  # This matches UserProfile.id which is a string
-        )
-        
-        await conn.close()
         
         return {
             "success": True,
@@ -97,48 +95,46 @@ async def check_out_attendance(
 ):
     """Record attendance check-out"""
     try:
-        conn = await get_db_connection()
-        
-        # Find the latest check-in for today
-        checkin_query = """
-        SELECT id, timestamp 
-        FROM attendance_logs 
-        WHERE person_id = $1 
-        AND timestamp >= CURRENT_DATE 
-        AND check_out_time IS NULL
-        ORDER BY timestamp DESC 
-        LIMIT 1
-        """
-        checkin = await conn.fetchrow(
-            checkin_query, 
-            uuid.UUID(checkout_data.person_id)
-        )
-        
-        if not checkin:
-            await conn.close()
-            raise HTTPException(
-                status_code=404,
-                detail="No active check-in found for this person today"
+        async with get_db_connection() as conn:
+        
+            # Find the latest check-in for today
+            checkin_query = """
+            SELECT id, timestamp 
+            FROM attendance_logs 
+            WHERE person_id = $1 
+            AND timestamp >= CURRENT_DATE 
+            AND check_out_time IS NULL
+            ORDER BY timestamp DESC 
+            LIMIT 1
+            """
+            checkin = await conn.fetchrow(
+                checkin_query, 
+                uuid.UUID(checkout_data.person_id)
+            )
+        
+            if not checkin:
+                raise HTTPException(
+                    status_code=404,
+                    detail="No active check-in found for this person today"
+                )
+        
+            # Update with check-out time
+            update_query = """
+            UPDATE attendance_logs 
+            SET check_out_time = $1, check_out_location = $2, check_out_notes = $3
+            WHERE id = $4
+            RETURNING id, timestamp, check_out_time
+            """
+        
+            now = datetime.now()
+            row = await conn.fetchrow(
+                update_query,
+                now,
+                checkout_data.location,
+                checkout_data.notes,
+                checkin['id']
             )
         
-        # Update with check-out time
-        update_query = """
-        UPDATE attendance_logs 
-        SET check_out_time = $1, check_out_location = $2, check_out_notes = $3
-        WHERE id = $4
-        RETURNING id, timestamp, check_out_time
-        """
-        
-        now = datetime.now()
-        row = await conn.fetchrow(
-            update_query,
-            now,
-            checkout_data.location,
-            checkout_data.notes,
-            checkin['id']
-        )
-        
-        await conn.close()
         
         # Calculate duration
         duration = now - checkin['timestamp']
@@ -171,36 +167,35 @@ async def get_daily_attendance_summary(
 ):
     """Get daily attendance summary"""
     try:
-        conn = await get_db_connection()
-        
-        # Use the daily_attendance_sum view if it exists, otherwise calculate
-        query = """
-        SELECT 
-            COUNT(DISTINCT person_id) as total_checked_in,
-            COUNT(DISTINCT CASE WHEN check_out_time IS NOT NULL THEN person_id END) as total_checked_out,
-            COUNT(DISTINCT CASE WHEN check_out_time IS NULL AND timestamp >= $1 THEN person_id END) as currently_present,
-            AVG(EXTRACT(EPOCH FROM (check_out_time - timestamp))/3600) as avg_hours_worked
-        FROM attendance_logs 
-        WHERE timestamp::date = $1
-        """
-        
-        summary = await conn.fetchrow(query, summary_date)
-        
-        # Get department-wise breakdown
-        dept_query = """
-        SELECT 
-            pr.person_type as department,
-            COUNT(DISTINCT al.person_id) as employee_count,
-            AVG(EXTRACT(EPOCH FROM (al.check_out_time - al.timestamp))/3600) as avg_hours
-        FROM attendance_logs al
-        JOIN person_records pr ON al.person_id = pr.id
-        WHERE al.timestamp::date = $1
-        GROUP BY pr.person_type
-        """
-        
-        dept_rows = await conn.fetch(dept_query, summary_date)
-        
-        await conn.close()
+        async with get_db_connection() as conn:
+        
+            # Use the daily_attendance_sum view if it exists, otherwise calculate
+            query = """
+            SELECT 
+                COUNT(DISTINCT person_id) as total_checked_in,
+                COUNT(DISTINCT CASE WHEN check_out_time IS NOT NULL THEN person_id END) as total_checked_out,
+                COUNT(DISTINCT CASE WHEN check_out_time IS NULL AND timestamp >= $1 THEN person_id END) as currently_present,
+                AVG(EXTRACT(EPOCH FROM (check_out_time - timestamp))/3600) as avg_hours_worked
+            FROM attendance_logs 
+            WHERE timestamp::date = $1
+            """
+        
+            summary = await conn.fetchrow(query, summary_date)
+        
+            # Get department-wise breakdown
+            dept_query = """
+            SELECT 
+                pr.person_type as department,
+                COUNT(DISTINCT al.person_id) as employee_count,
+                AVG(EXTRACT(EPOCH FROM (al.check_out_time - al.timestamp))/3600) as avg_hours
+            FROM attendance_logs al
+            JOIN person_records pr ON al.person_id = pr.id
+            WHERE al.timestamp::date = $1
+            GROUP BY pr.person_type
+            """
+        
+            dept_rows = await conn.fetch(dept_query, summary_date)
+        
         
         department_breakdown = []
         for row in dept_rows:
@@ -235,34 +230,33 @@ async def get_person_attendance(
 ):
     """Get attendance history for a specific person"""
     try:
-        conn = await get_db_connection()
-        
-        query = """
-        SELECT 
-            al.id,
-            al.timestamp as check_in_time,
-            al.check_out_time,
-            al.method,
-            al.location,
-            al.status,
-            EXTRACT(EPOCH FROM (al.check_out_time - al.timestamp))/3600 as hours_worked,
-            pr.full_name,
-            pr.staff_id
-        FROM attendance_logs al
-        JOIN person_records pr ON al.person_id = pr.id
-        WHERE al.person_id = $1 
-        AND al.timestamp::date BETWEEN $2 AND $3
-        ORDER BY al.timestamp DESC
-        """
-        
-        rows = await conn.fetch(
-            query, 
-            uuid.UUID(person_id), 
-            start_date, 
-            end_date
-        )
-        
-        await conn.close()
+        async with get_db_connection() as conn:
+        
+            query = """
+            SELECT 
+                al.id,
+                al.timestamp as check_in_time,
+                al.check_out_time,
+                al.method,
+                al.location,
+                al.status,
+                EXTRACT(EPOCH FROM (al.check_out_time - al.timestamp))/3600 as hours_worked,
+                pr.full_name,
+                pr.staff_id
+            FROM attendance_logs al
+            JOIN person_records pr ON al.person_id = pr.id
+            WHERE al.person_id = $1 
+            AND al.timestamp::date BETWEEN $2 AND $3
+            ORDER BY al.timestamp DESC
+            """
+        
+            rows = await conn.fetch(
+                query, 
+                uuid.UUID(person_id), 
+                start_date, 
+                end_date
+            )
+        
         
         attendance_history = []
         total_hours = 0
@@ -314,28 +308,27 @@ async def get_recent_rfid_scans(
 ):
     """Get recent RFID scans for monitoring"""
     try:
-        conn = await get_db_connection()
-        
-        query = """
-        SELECT 
-            al.id as scan_id,
-            pr.staff_id,
-            pr.full_name,
-            pr.person_type,
-            al.timestamp as scan_time,
-            al.location,
-            al.status,
-            al.method
-        FROM attendance_logs al
-        JOIN person_records pr ON al.person_id = pr.id
-        WHERE al.method = 'rfid' 
-        AND al.timestamp >= NOW() - INTERVAL '1 hour' * $1
-        ORDER BY al.timestamp DESC
-        LIMIT 100
-        """
-        
-        rows = await conn.fetch(query, hours)
-        await conn.close()
+        async with get_db_connection() as conn:
+        
+            query = """
+            SELECT 
+                al.id as scan_id,
+                pr.staff_id,
+                pr.full_name,
+                pr.person_type,
+                al.timestamp as scan_time,
+                al.location,
+                al.status,
+                al.method
+            FROM attendance_logs al
+            JOIN person_records pr ON al.person_id = pr.id
+            WHERE al.method = 'rfid' 
+            AND al.timestamp >= NOW() - INTERVAL '1 hour' * $1
+            ORDER BY al.timestamp DESC
+            LIMIT 100
+            """
+        
+            rows = await conn.fetch(query, hours)
         
         rfid_scans = []
         for row in rows:
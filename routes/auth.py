@@ -1,31 +1,51 @@
 # routes/auth.py
 import os
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict, Any
 import uuid
-from supabase import create_client, Client
+import time
+import hashlib
+from cachetools import TTLCache
 from pydantic import BaseModel
 from database import get_db_connection
+from utils.clock import now_iso
 import asyncpg
 import jwt
 from datetime import datetime, timedelta
 from jwt.exceptions import InvalidTokenError
 import asyncio
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
-# Supabase client initialization
-supabase: Client = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_SERVICE_KEY")
-)
-
 # JWT Configuration
 JWT_SECRET = os.getenv("SECRET_KEY", "2WJa-_ZdZAAogvRDVwy3T3n826O729i_R85m4F6T2H4")
 JWT_ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
+# Verified token payloads keyed by SHA-256 of the token (never the token
+# itself), so repeat requests with the same bearer skip signature checks
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(key)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    _token_cache[key] = payload
+    return payload
+
+# Responses carrying tokens must never be stored by browsers or proxies
+NO_CACHE_HEADERS = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+}
+
 # Login request/response models
 class LoginRequest(BaseModel):
     staff_id: str
@@ -41,18 +61,7 @@ class UserProfile(BaseModel):
 async def login(login_data: LoginRequest):
     """Login with staff ID - Returns proper JWT token in frontend-compatible format"""
     try:
-        print(f"🔐 [AUTH] Login attempt for staff_id: {login_data.staff_id}")
-        
-        # ✅ ADD TIMEOUT TO DATABASE CONNECTION (5 seconds)
-        try:
-            conn = await asyncio.wait_for(get_db_connection(), timeout=5.0)
-            print(f"✅ [AUTH] Database connection established")
-        except asyncio.TimeoutError:
-            print(f"❌ [AUTH] Database connection timeout after 5 seconds")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database connection timeout. Please try again."
-            )
+        logger.info("[AUTH] Login attempt for staff_id: %s", login_data.staff_id)
         
         # Find user by staff_id in person_records with timeout
         query = """
@@ -68,33 +77,35 @@ async def login(login_data: LoginRequest):
         WHERE staff_id = $1 AND status = 'active'
         """
         
+        # ✅ ADD TIMEOUT TO POOL ACQUIRE (5 seconds)
         try:
-            # ✅ ADD TIMEOUT TO QUERY (3 seconds)
-            user = await asyncio.wait_for(
-                conn.fetchrow(query, login_data.staff_id),
-                timeout=3.0
-            )
-            print(f"✅ [AUTH] Query completed for staff_id: {login_data.staff_id}")
+            async with get_db_connection(timeout=5.0) as conn:
+                try:
+                    # ✅ ADD TIMEOUT TO QUERY (3 seconds)
+                    user = await asyncio.wait_for(
+                        conn.fetchrow(query, login_data.staff_id),
+                        timeout=3.0
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning("[AUTH] Query timeout after 3 seconds")
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="Database query timeout. Please try again."
+                    )
         except asyncio.TimeoutError:
-            print(f"❌ [AUTH] Query timeout after 3 seconds")
-            await conn.close()
+            logger.warning("[AUTH] Database connection timeout after 5 seconds")
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database query timeout. Please try again."
+                detail="Database connection timeout. Please try again."
             )
-        finally:
-            await conn.close()
-            print(f"✅ [AUTH] Database connection closed")
         
         if not user:
-            print(f"❌ [AUTH] User not found or inactive: {login_data.staff_id}")
+            logger.info("[AUTH] User not found or inactive: %s", login_data.staff_id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid staff ID or user not active"
             )
         
-        print(f"✅ [AUTH] User found: {user['staff_id']} ({user['role']})")
-        
         # Create JWT token with user data
         token_data = {
             "sub": str(user['id']),
@@ -107,8 +118,6 @@ async def login(login_data: LoginRequest):
         
         token = jwt.encode(token_data, JWT_SECRET, algorithm=JWT_ALGORITHM)
         
-        print(f"✅ [AUTH] JWT token generated for {user['staff_id']}")
-        
         # ✅ RETURN IN FRONTEND-COMPATIBLE FORMAT
         response = {
             "success": True,
@@ -130,15 +139,13 @@ async def login(login_data: LoginRequest):
             "message": "Login successful"
         }
         
-        print(f"✅ [AUTH] Login successful for {user['staff_id']}")
-        return response
+        logger.info("[AUTH] Login successful for %s (%s)", user['staff_id'], user['role'])
+        return ORJSONResponse(content=response, headers=NO_CACHE_HEADERS)
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ [AUTH] Unexpected error during login: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[AUTH] Unexpected error during login: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Login failed: {str(e)}"
@@ -151,8 +158,8 @@ async def get_current_user(
     try:
         token = credentials.credentials
         
-        # Decode JWT token
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        # Decode JWT token (cached briefly after the first verification)
+        payload = _decode_token(token)
         
         # Get user data from token
         staff_id = payload.get("staff_id")
@@ -194,7 +201,6 @@ async def get_current_user(
 async def get_user_profile(user_id: str) -> Dict[str, Any]:
     """Get user profile from person_records table"""
     try:
-        conn = await asyncio.wait_for(get_db_connection(), timeout=5.0)
         query = """
         SELECT 
             pr.person_type as role,
@@ -203,11 +209,11 @@ async def get_user_profile(user_id: str) -> Dict[str, Any]:
         FROM person_records pr
         WHERE pr.system_account_id = $1
         """
-        profile = await asyncio.wait_for(
-            conn.fetchrow(query, uuid.UUID(user_id)),
-            timeout=3.0
-        )
-        await conn.close()
+        async with get_db_connection(timeout=5.0) as conn:
+            profile = await asyncio.wait_for(
+                conn.fetchrow(query, uuid.UUID(user_id)),
+                timeout=3.0
+            )
         
         if profile:
             return {
@@ -221,8 +227,13 @@ async def get_user_profile(user_id: str) -> Dict[str, Any]:
         return {"role": "staff"}
 
 # Role-based access control dependencies
+# Allow-lists are built once at import instead of a new list per request
+ADMIN_ROLES = frozenset({"admin", "harvestflow_manager"})
+SUPERVISOR_ROLES = frozenset({"supervisor", "flavorcore_supervisor", "admin", "flavorcore_manager"})
+MANAGER_ROLES = frozenset({"admin", "harvestflow_manager", "flavorcore_manager", "flavorcore_supervisor"})
+
 async def require_admin(user: UserProfile = Depends(get_current_user)):
-    if user.role not in ["admin", "harvestflow_manager"]:
+    if user.role not in ADMIN_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
@@ -230,8 +241,7 @@ async def require_admin(user: UserProfile = Depends(get_current_user)):
     return user
 
 async def require_supervisor(user: UserProfile = Depends(get_current_user)):
-    allowed_roles = ["supervisor", "flavorcore_supervisor", "admin", "flavorcore_manager"]
-    if user.role not in allowed_roles:
+    if user.role not in SUPERVISOR_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Supervisor privileges required"
@@ -239,8 +249,7 @@ async def require_supervisor(user: UserProfile = Depends(get_current_user)):
     return user
 
 async def require_manager(user: UserProfile = Depends(get_current_user)):
-    allowed_roles = ["admin", "harvestflow_manager", "flavorcore_manager", "flavorcore_supervisor"]
-    if user.role not in allowed_roles:
+    if user.role not in MANAGER_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Manager privileges required"
@@ -281,5 +290,5 @@ async def auth_health_check():
     return {
         "status": "healthy",
         "service": "authentication",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": now_iso()
     }
\ No newline at end of file
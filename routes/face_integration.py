@@ -9,11 +9,11 @@ from database import get_db_connection
 import asyncpg
 import uuid
 import base64
-import cv2
-import numpy as np
+import asyncio
 from datetime import datetime
 from services.face_service import FaceRecognitionService
 from routes.auth import get_current_user, require_admin
+from utils.staff_ids import generate_staff_id
 
 router = APIRouter(prefix="/api/face-integration", tags=["face_integration"])
 face_service = FaceRecognitionService()
@@ -28,10 +28,9 @@ async def process_face_from_onboarding(
     Extract face embedding from onboarding image and register it
     """
     try:
-        # Decode base64 image
+        # Decode base64 image and extract the embedding (returns list) off the event loop
         image_data = base64.b64decode(face_image_base64)
-        nparr = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img, embedding = await asyncio.to_thread(face_service.decode_and_embed, image_data)
         
         if img is None:
             return {
@@ -39,9 +38,6 @@ async def process_face_from_onboarding(
                 "error": "Invalid image format"
             }
         
-        # Extract face embedding (returns list)
-        embedding = face_service.extract_embedding(img)
-        
         if embedding is None:
             return {
                 "success": False,
@@ -49,7 +45,7 @@ async def process_face_from_onboarding(
             }
         
         # Save face image to file system
-        image_path = face_service.save_face_image(person_id, img)
+        image_path = await asyncio.to_thread(face_service.save_face_image, person_id, img)
         
         # Update person record with embedding
         update_query = """
@@ -91,10 +87,11 @@ async def approve_onboarding_with_face_registration(
     """
     Approve onboarding request AND automatically register face
     """
+    if entity_type != "staff":
+        raise HTTPException(status_code=501, detail="Entity onboarding with face not yet implemented")
+    
     try:
-        conn = await get_db_connection()
-        
-        if entity_type == "staff":
+        async with get_db_connection() as conn:
             # Get onboarding request with face image
             request_query = """
             SELECT first_name, last_name, mobile, address, role, 
@@ -106,7 +103,6 @@ async def approve_onboarding_with_face_registration(
             request_data = await conn.fetchrow(request_query, uuid.UUID(request_id))
             
             if not request_data:
-                await conn.close()
                 raise HTTPException(status_code=404, detail="Pending staff onboarding request not found")
             
             # Generate staff ID
@@ -156,32 +152,25 @@ async def approve_onboarding_with_face_registration(
             """
             
             await conn.execute(update_query, uuid.UUID(current_user.id), now, uuid.UUID(request_id))
-            await conn.close()
-            
-            return {
-                "success": True,
-                "data": {
-                    "person_id": str(person_id),
-                    "staff_id": staff_id,
-                    "onboarding_request_id": request_id,
-                    "face_registered": face_result["success"],
-                    "face_info": face_result
-                },
-                "message": "Staff onboarding approved" + (
-                    " and face registered successfully" if face_result["success"] 
-                    else f" but face registration failed: {face_result.get('error', 'Unknown error')}"
-                )
-            }
-            
-        else:
-            await conn.close()
-            raise HTTPException(status_code=501, detail="Entity onboarding with face not yet implemented")
+        
+        return {
+            "success": True,
+            "data": {
+                "person_id": str(person_id),
+                "staff_id": staff_id,
+                "onboarding_request_id": request_id,
+                "face_registered": face_result["success"],
+                "face_info": face_result
+            },
+            "message": "Staff onboarding approved" + (
+                " and face registered successfully" if face_result["success"] 
+                else f" but face registration failed: {face_result.get('error', 'Unknown error')}"
+            )
+        }
             
     except HTTPException:
         raise
     except Exception as e:
-        if 'conn' in locals():
-            await conn.close()
         raise HTTPException(status_code=500, detail=f"Error in integrated approval: {str(e)}")
 
 
@@ -202,26 +191,19 @@ async def mark_attendance_with_face(
         }
     
     try:
-        conn = await get_db_connection()
-        
-        # Decode image
+        # Decode image and extract the embedding off the event loop
         image_data = base64.b64decode(image)
-        nparr = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img, query_embedding = await asyncio.to_thread(face_service.decode_and_embed, image_data)
         
         if img is None:
-            await conn.close()
             return {
                 "success": False,
                 "authenticated": False,
                 "error": "Invalid image format"
             }
         
-        # Extract face embedding
-        query_embedding = face_service.extract_embedding(img)
-        
+
         if query_embedding is None:
-            await conn.close()
             return {
                 "success": False,
                 "authenticated": False,
@@ -236,35 +218,24 @@ async def mark_attendance_with_face(
         AND status = 'active'
         """
         
-        persons = await conn.fetch(faces_query)
+        async with get_db_connection() as conn:
+            persons = await conn.fetch(faces_query)
         
         if not persons:
-            await conn.close()
             return {
                 "success": False,
                 "authenticated": False,
                 "error": "No registered faces in database"
             }
         
-        # Find best match
-        best_match = None
-        best_similarity = 0.0
+        # Find best match in a worker thread
         threshold = 0.6
-        
-        for person in persons:
-            if person['face_embedding'] is None:
-                continue
-                
-            stored_embedding = person['face_embedding']
-            
-            similarity = face_service.compare_embeddings(
-                query_embedding,
-                stored_embedding
-            )
-            
-            if similarity > best_similarity and similarity >= threshold:
-                best_similarity = similarity
-                best_match = person
+        best_match, best_similarity = await asyncio.to_thread(
+            face_service.find_best_match,
+            query_embedding,
+            [(person, person['face_embedding']) for person in persons],
+            threshold
+        )
         
         if best_match:
             # Mark attendance - Use 'timestamp' column (not 'check_in_time')
@@ -277,19 +248,18 @@ async def mark_attendance_with_face(
             """
             
             now = datetime.now()
-            attendance_id = await conn.fetchval(
-                attendance_query,
-                best_match['id'],
-                'face',  # matches your CHECK constraint
-                now,     # ✅ CORRECTED: Use 'timestamp' column
-                location,
-                float(best_similarity),
-                device_id,
-                'present',
-                now
-            )
-            
-            await conn.close()
+            async with get_db_connection() as conn:
+                attendance_id = await conn.fetchval(
+                    attendance_query,
+                    best_match['id'],
+                    'face',  # matches your CHECK constraint
+                    now,     # ✅ CORRECTED: Use 'timestamp' column
+                    location,
+                    float(best_similarity),
+                    device_id,
+                    'present',
+                    now
+                )
             
             return {
                 "success": True,
@@ -304,7 +274,6 @@ async def mark_attendance_with_face(
                 "mode": face_service.mode
             }
         else:
-            await conn.close()
             return {
                 "success": False,
                 "authenticated": False,
@@ -314,38 +283,8 @@ async def mark_attendance_with_face(
             }
             
     except Exception as e:
-        if 'conn' in locals():
-            await conn.close()
         return {
             "success": False,
             "authenticated": False,
             "error": f"Attendance marking failed: {str(e)}"
         }
-
-
-async def generate_staff_id(conn, person_type: str) -> str:
-    """Generate unique staff ID based on person type"""
-    prefix_map = {
-        'admin': 'ADM',
-        'harvestflow_manager': 'HFM',
-        'flavorcore_manager': 'FCM',
-        'flavorcore_supervisor': 'FCS',
-        'harvesting': 'HRV',
-        'staff': 'STF',
-        'supplier': 'SUP',
-        'vendor': 'VND'
-    }
-    
-    prefix = prefix_map.get(person_type, 'EMP')
-    timestamp = datetime.now().strftime("%y%m%d")
-    
-    sequence_query = """
-    SELECT COUNT(*) as count 
-    FROM person_records 
-    WHERE staff_id LIKE $1
-    """
-    pattern = f"{prefix}-{timestamp}-%"
-    count = await conn.fetchval(sequence_query, pattern)
-    sequence = count + 1
-    
-    return f"{prefix}-{timestamp}-{sequence:04d}"
\ No newline at end of file
@@ -3,13 +3,12 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import PersonRecord
 from services.face_service import FaceRecognitionService
-from utils import require_role
-import cv2
-import numpy as np
+from utils import require_role, UserSnapshot
+import asyncio
 from typing import Optional
 import uuid
 from datetime import datetime
-from config import settings
+from config import FACE_CONFIDENCE_THRESHOLD
 from fastapi import status
 
 router = APIRouter(tags=["face_recognition"])
@@ -20,7 +19,7 @@ async def register_face(
     person_id: str = Form(...),
     image: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["admin", "harvestflow_manager", "flavorcore_manager"]))
+    current_user: UserSnapshot = Depends(require_role(["admin", "harvestflow_manager", "flavorcore_manager"]))
 ):
     """
     Register face for a person.
@@ -33,10 +32,9 @@ async def register_face(
         )
     
     try:
-        # Read image
+        # Read image, then decode and extract the embedding off the event loop
         contents = await image.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img, embedding = await asyncio.to_thread(face_service.decode_and_embed, contents)
         
         if img is None:
             raise HTTPException(
@@ -44,8 +42,6 @@ async def register_face(
                 detail="Invalid image format"
             )
         
-        # Extract face embedding
-        embedding = face_service.extract_embedding(img)
         if embedding is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -64,7 +60,7 @@ async def register_face(
             )
         
         # Save face image
-        image_path = face_service.save_face_image(str(person.id), img)
+        image_path = await asyncio.to_thread(face_service.save_face_image, str(person.id), img)
         
         # Update person record with embedding
         person.face_embedding = embedding
@@ -106,10 +102,9 @@ async def authenticate_face(
         }
     
     try:
-        # Read image
+        # Read image, then decode and extract the embedding off the event loop
         contents = await image.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img, query_embedding = await asyncio.to_thread(face_service.decode_and_embed, contents)
         
         if img is None:
             return {
@@ -117,8 +112,6 @@ async def authenticate_face(
                 "error": "Invalid image format"
             }
         
-        # Extract query embedding
-        query_embedding = face_service.extract_embedding(img)
         if query_embedding is None:
             return {
                 "authenticated": False,
@@ -137,20 +130,14 @@ async def authenticate_face(
                 "error": "No registered faces in database"
             }
         
-        # Compare with all registered faces
-        best_match = None
-        best_similarity = 0.0
-        threshold = settings.FACE_CONFIDENCE_THRESHOLD
-        
-        for person in persons:
-            similarity = face_service.compare_embeddings(
-                query_embedding,
-                person.face_embedding
-            )
-            
-            if similarity > best_similarity and similarity >= threshold:
-                best_similarity = similarity
-                best_match = person
+        # Compare with all registered faces in a worker thread
+        threshold = FACE_CONFIDENCE_THRESHOLD
+        best_match, best_similarity = await asyncio.to_thread(
+            face_service.find_best_match,
+            query_embedding,
+            [(person, person.face_embedding) for person in persons],
+            threshold
+        )
         
         if best_match:
             return {
@@ -1,18 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, Form
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, WriteBatcher
 from models import Dispatch, GPSTrackingLog, GeofenceAlert, PersonRecord
 from services import NotificationService
-from utils import require_role
+from utils import require_role, UserSnapshot
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+import os
 import uuid
 import math
+from config import (
+    GEOFENCE_RADIUS_KM,
+    FARM_LAT,
+    FARM_LON,
+    PROCESSING_UNIT_LAT,
+    PROCESSING_UNIT_LON,
+)
 
 router = APIRouter(prefix="/gps", tags=["gps_tracking"])
 notification_service = NotificationService()
 
+# Real-time location pings from all drivers share INSERT round-trips
+gps_log_writes = WriteBatcher(
+    """
+    INSERT INTO gps_tracking_logs (
+        id, dispatch_id, latitude, longitude, speed, timestamp, is_offline_queued
+    ) VALUES ($1, $2, $3, $4, $5, $6, false)
+    """,
+    max_batch=int(os.getenv("GPS_BATCH_SIZE", "32")),
+    max_delay=float(os.getenv("GPS_BATCH_DELAY_MS", "5")) / 1000
+)
+
 class GPSLocation(BaseModel):
     latitude: float
     longitude: float
@@ -44,7 +63,7 @@ def calculate_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) ->
 async def start_gps_tracking(
     dispatch_id: str,
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["driver", "harvestflow_manager"]))
+    current_user: UserSnapshot = Depends(require_role(["driver", "harvestflow_manager"]))
 ):
     """Start GPS tracking for a dispatch"""
     
@@ -72,10 +91,9 @@ async def log_gps_location(
     longitude: float = Form(...),
     speed: Optional[float] = Form(None),
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["driver"]))
+    current_user: UserSnapshot = Depends(require_role(["driver"]))
 ):
     """Log single GPS location (real-time)"""
-    from config import settings
     
     dispatch = db.query(Dispatch).filter(
         Dispatch.dispatch_id == uuid.UUID(dispatch_id),
@@ -85,33 +103,31 @@ async def log_gps_location(
     if not dispatch:
         raise HTTPException(status_code=404, detail="Dispatch not found or unauthorized")
     
-    # Create GPS log
-    gps_log = GPSTrackingLog(
-        dispatch_id=dispatch.dispatch_id,
-        latitude=latitude,
-        longitude=longitude,
-        speed=speed,
-        timestamp=datetime.utcnow()
+    # Write the GPS log through the shared batcher. It commits on its own
+    # asyncpg connection, separately from the geofence alert below (sync
+    # Session): the log is kept even if the alert write fails, and an alert
+    # is only written after its log row exists.
+    logged_at = datetime.now(timezone.utc)
+    await gps_log_writes.submit(
+        (uuid.uuid4(), dispatch.dispatch_id, latitude, longitude, speed, logged_at)
     )
     
-    db.add(gps_log)
-    
     # Check geofence
     # Distance from farm
     dist_from_farm = calculate_distance_km(
         latitude, longitude,
-        settings.FARM_LATITUDE, settings.FARM_LONGITUDE
+        FARM_LAT, FARM_LON
     )
     
     # Distance from processing unit
     dist_from_processing = calculate_distance_km(
         latitude, longitude,
-        settings.PROCESSING_UNIT_LATITUDE, settings.PROCESSING_UNIT_LONGITUDE
+        PROCESSING_UNIT_LAT, PROCESSING_UNIT_LON
     )
     
     # Alert if outside geofence
-    if (dist_from_farm > settings.GPS_GEOFENCE_RADIUS_KM and 
-        dist_from_processing > settings.GPS_GEOFENCE_RADIUS_KM):
+    if (dist_from_farm > GEOFENCE_RADIUS_KM and 
+        dist_from_processing > GEOFENCE_RADIUS_KM):
         
         # Create alert
         alert = GeofenceAlert(
@@ -142,16 +158,16 @@ async def log_gps_location(
     
     return {
         "success": True,
-        "logged_at": gps_log.timestamp.isoformat(),
-        "geofence_status": "inside" if (dist_from_farm <= settings.GPS_GEOFENCE_RADIUS_KM or 
-                                        dist_from_processing <= settings.GPS_GEOFENCE_RADIUS_KM) else "outside"
+        "logged_at": logged_at.isoformat(),
+        "geofence_status": "inside" if (dist_from_farm <= GEOFENCE_RADIUS_KM or 
+                                        dist_from_processing <= GEOFENCE_RADIUS_KM) else "outside"
     }
 
 @router.post("/sync-batch")
 async def sync_gps_batch(
     request: BatchGPSSync,
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["driver"]))
+    current_user: UserSnapshot = Depends(require_role(["driver"]))
 ):
     """Sync batch of offline GPS locations"""
     from utils import OfflineSyncQueue
@@ -178,7 +194,7 @@ async def sync_gps_batch(
 async def get_dispatch_tracking(
     dispatch_id: str,
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["admin", "harvestflow_manager", "flavorcore_manager"]))
+    current_user: UserSnapshot = Depends(require_role(["admin", "harvestflow_manager", "flavorcore_manager"]))
 ):
     """Get GPS tracking history for a dispatch"""
     
@@ -204,7 +220,7 @@ async def get_dispatch_tracking(
 async def complete_dispatch(
     dispatch_id: str,
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["driver"]))
+    current_user: UserSnapshot = Depends(require_role(["driver"]))
 ):
     """Mark dispatch as delivered"""
     
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 import uuid
 
-from database import get_db
+from database import get_db, get_readonly_db
 from models.job_type import DailyJobType
 from routes.auth import get_current_user, require_admin, UserProfile
 
@@ -62,7 +62,7 @@ class DailyJobUpdate(BaseModel):
 
 @router.get("/jobs")
 def get_jobs(
-    db: Session = Depends(get_db), 
+    db: Session = Depends(get_readonly_db), 
     current_user: UserProfile = Depends(get_current_user)
 ):
     """Get all daily jobs (alias for job-types for frontend compatibility)"""
@@ -96,7 +96,7 @@ def get_jobs(
         raise HTTPException(status_code=500, detail=f"Error fetching jobs: {str(e)}")
 
 @router.get("/job-types")
-def get_daily_job_types(db: Session = Depends(get_db)):
+def get_daily_job_types(db: Session = Depends(get_readonly_db)):
     """Get all job types from daily_job_types table - Public endpoint"""
     try:
         job_types = (
@@ -187,7 +187,7 @@ def create_job_type(
 @router.get("/job-types/{job_type_id}")
 def get_job_type(
     job_type_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_readonly_db),
     current_user: UserProfile = Depends(get_current_user)
 ):
     """Get a specific job type by ID"""
@@ -314,7 +314,7 @@ def delete_job_type(
 def get_production_report(
     start_date: date,
     end_date: date,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_readonly_db),
     current_user: UserProfile = Depends(require_admin_or_manager)
 ):
     """Get production report with data from multiple tables"""
@@ -10,14 +10,16 @@ import asyncpg
 from pydantic import BaseModel
 from routes.auth import get_current_user, require_admin  # require_manager is not used anymore
 from services.notification_service import notification_service
+from utils.staff_ids import generate_staff_id
 
 router = APIRouter()
 
 # --- New dependency: allow Admin or Manager roles ---
+ONBOARDING_REVIEW_ROLES = frozenset({"admin", "harvestflow_manager", "flavorcore_manager", "supervisor"})
+
 async def require_manager_or_admin(current_user=Depends(get_current_user)):
-    allowed_roles = ["admin", "harvestflow_manager", "flavorcore_manager", "supervisor"]
     user_role = current_user.role.lower() if hasattr(current_user, 'role') else ''
-    if user_role not in allowed_roles:  # ✅ CORRECT
+    if user_role not in ONBOARDING_REVIEW_ROLES:  # ✅ CORRECT
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied. Only Admins or Managers can view pending onboarding requests."
@@ -57,8 +59,6 @@ async def create_onboarding_request(
 ):
     """Create a new onboarding request with file uploads"""
     try:
-        conn = await get_db_connection()
-        
         # Handle file uploads
         face_image_data = None
         aadhaar_data = None
@@ -73,10 +73,11 @@ async def create_onboarding_request(
         
         # For suppliers/vendors, create onboarding_pending record
         if entity_type in ['supplier', 'vendor']:
-            result = await create_supplier_vendor_onboarding(
-                conn, first_name, last_name, mobile, address, role, aadhaar,
-                face_image_data, aadhaar_data, entity_type, current_user
-            )
+            async with get_db_connection() as conn:
+                result = await create_supplier_vendor_onboarding(
+                    conn, first_name, last_name, mobile, address, role, aadhaar,
+                    face_image_data, aadhaar_data, entity_type, current_user
+                )
             
             # Send notification for supplier/vendor onboarding
             await notification_service.notify_supplier_onboarding(
@@ -88,10 +89,11 @@ async def create_onboarding_request(
             return result
         else:
             # For staff, create onboarding_requests record
-            result = await create_staff_onboarding(
-                conn, first_name, last_name, mobile, address, role, aadhaar,
-                face_image_data, aadhaar_data, current_user
-            )
+            async with get_db_connection() as conn:
+                result = await create_staff_onboarding(
+                    conn, first_name, last_name, mobile, address, role, aadhaar,
+                    face_image_data, aadhaar_data, current_user
+                )
             
             # Send notification for staff onboarding
             await notification_service.notify_new_onboarding_request(
@@ -134,8 +136,6 @@ async def create_staff_onboarding(conn, first_name, last_name, mobile, address,
         now
     )
     
-    await conn.close()
-    
     return {
         "success": True,
         "data": {
@@ -189,8 +189,6 @@ async def create_supplier_vendor_onboarding(conn, first_name, last_name, mobile,
         json.dumps(approval_checklist)
     )
     
-    await conn.close()
-    
     return {
         "success": True,
         "data": {
@@ -209,92 +207,91 @@ async def get_pending_onboarding(
 ):
     """Get all pending onboarding requests from both tables"""
     try:
-        conn = await get_db_connection()
-        all_requests = []
+        async with get_db_connection() as conn:
+            all_requests = []
         
-        # --- Fetch from onboarding_requests (staff) ---
-        staff_where_conditions = []
-        staff_params = []
-        staff_param_count = 1
+            # --- Fetch from onboarding_requests (staff) ---
+            staff_where_conditions = []
+            staff_params = []
+            staff_param_count = 1
         
-        if status:
-            staff_where_conditions.append(f"status = ${staff_param_count}")
-            staff_params.append(status)
-            staff_param_count += 1
-        else:
-            staff_where_conditions.append(f"status = ${staff_param_count}")
-            staff_params.append('pending')
-            staff_param_count += 1
+            if status:
+                staff_where_conditions.append(f"status = ${staff_param_count}")
+                staff_params.append(status)
+                staff_param_count += 1
+            else:
+                staff_where_conditions.append(f"status = ${staff_param_count}")
+                staff_params.append('pending')
+                staff_param_count += 1
             
-        staff_where_clause = f"WHERE {' AND '.join(staff_where_conditions)}" if staff_where_conditions else ""
-        staff_query = f"""
-        SELECT 
-            id, first_name, last_name, mobile, role, status,
-            submitted_by, approved_by, created_at
-        FROM onboarding_requests
-        {staff_where_clause}
-        ORDER BY created_at DESC
-        """
-        staff_rows = await conn.fetch(staff_query, *staff_params)
+            staff_where_clause = f"WHERE {' AND '.join(staff_where_conditions)}" if staff_where_conditions else ""
+            staff_query = f"""
+            SELECT 
+                id, first_name, last_name, mobile, role, status,
+                submitted_by, approved_by, created_at
+            FROM onboarding_requests
+            {staff_where_clause}
+            ORDER BY created_at DESC
+            """
+            staff_rows = await conn.fetch(staff_query, *staff_params)
         
-        for row in staff_rows:
-            all_requests.append({
-                "id": str(row['id']),
-                "type": "staff",
-                "entity_type": "staff",
-                "name": f"{row['first_name']} {row['last_name']}",
-                "role": row['role'],
-                "status": row['status'],
-                "submitted_at": row['created_at'].isoformat() if row['created_at'] else None,
-                "mobile": row['mobile']
-            })
+            for row in staff_rows:
+                all_requests.append({
+                    "id": str(row['id']),
+                    "type": "staff",
+                    "entity_type": "staff",
+                    "name": f"{row['first_name']} {row['last_name']}",
+                    "role": row['role'],
+                    "status": row['status'],
+                    "submitted_at": row['created_at'].isoformat() if row['created_at'] else None,
+                    "mobile": row['mobile']
+                })
         
-        # --- Fetch from onboarding_pending (suppliers/vendors) ---
-        pending_where_conditions = []
-        pending_params = []
-        pending_param_count = 1
+            # --- Fetch from onboarding_pending (suppliers/vendors) ---
+            pending_where_conditions = []
+            pending_params = []
+            pending_param_count = 1
         
-        if entity_type and entity_type != 'staff':
-            pending_where_conditions.append(f"entity_type = ${pending_param_count}")
-            pending_params.append(entity_type)
-            pending_param_count += 1
+            if entity_type and entity_type != 'staff':
+                pending_where_conditions.append(f"entity_type = ${pending_param_count}")
+                pending_params.append(entity_type)
+                pending_param_count += 1
         
-        if status:
-            pending_where_conditions.append(f"status = ${pending_param_count}")
-            pending_params.append(status)
-            pending_param_count += 1
-        else:
-            pending_where_conditions.append(f"status = ${pending_param_count}")
-            pending_params.append('pending')
-            pending_param_count += 1
+            if status:
+                pending_where_conditions.append(f"status = ${pending_param_count}")
+                pending_params.append(status)
+                pending_param_count += 1
+            else:
+                pending_where_conditions.append(f"status = ${pending_param_count}")
+                pending_params.append('pending')
+                pending_param_count += 1
             
-        pending_where_clause = f"WHERE {' AND '.join(pending_where_conditions)}" if pending_where_conditions else ""
-        pending_query = f"""
-        SELECT 
-            id, entity_type, data, status, submitted_at, reviewed_at,
-            submitted_by, reviewed_by, remarks, approval_checklist, created_at
-        FROM onboarding_pending
-        {pending_where_clause}
-        ORDER BY submitted_at DESC
-        """
-        pending_rows = await conn.fetch(pending_query, *pending_params)
+            pending_where_clause = f"WHERE {' AND '.join(pending_where_conditions)}" if pending_where_conditions else ""
+            pending_query = f"""
+            SELECT 
+                id, entity_type, data, status, submitted_at, reviewed_at,
+                submitted_by, reviewed_by, remarks, approval_checklist, created_at
+            FROM onboarding_pending
+            {pending_where_clause}
+            ORDER BY submitted_at DESC
+            """
+            pending_rows = await conn.fetch(pending_query, *pending_params)
         
-        for row in pending_rows:
-            data = json.loads(row['data']) if row['data'] else {}
-            personal_info = data.get('personal_info', {})
-            all_requests.append({
-                "id": str(row['id']),
-                "type": "entity",
-                "entity_type": row['entity_type'],
-                "name": f"{personal_info.get('first_name', '')} {personal_info.get('last_name', '')}".strip(),
-                "role": data.get('role'),
-                "status": row['status'],
-                "submitted_at": row['submitted_at'].isoformat() if row['submitted_at'] else None,
-                "reviewed_at": row['reviewed_at'].isoformat() if row['reviewed_at'] else None,
-                "approval_checklist": json.loads(row['approval_checklist']) if row['approval_checklist'] else {}
-            })
+            for row in pending_rows:
+                data = json.loads(row['data']) if row['data'] else {}
+                personal_info = data.get('personal_info', {})
+                all_requests.append({
+                    "id": str(row['id']),
+                    "type": "entity",
+                    "entity_type": row['entity_type'],
+                    "name": f"{personal_info.get('first_name', '')} {personal_info.get('last_name', '')}".strip(),
+                    "role": data.get('role'),
+                    "status": row['status'],
+                    "submitted_at": row['submitted_at'].isoformat() if row['submitted_at'] else None,
+                    "reviewed_at": row['reviewed_at'].isoformat() if row['reviewed_at'] else None,
+                    "approval_checklist": json.loads(row['approval_checklist']) if row['approval_checklist'] else {}
+                })
         
-        await conn.close()
         
         return {
             "success": True,
@@ -303,7 +300,6 @@ async def get_pending_onboarding(
         }
         
     except Exception as e:
-        await conn.close()  # Ensure connection is closed on error
         raise HTTPException(status_code=500, detail=f"Error retrieving pending onboarding: {str(e)}")
 
 @router.post("/{request_id}/approve")
@@ -314,37 +310,26 @@ async def approve_onboarding_request(
 ):
     """Approve an onboarding request"""
     try:
-        conn = await get_db_connection()
+        async with get_db_connection() as conn:
+            if entity_type == "staff":
+                result = await approve_staff_onboarding(conn, request_id, current_user)
+            else:
+                result = await approve_entity_onboarding(conn, request_id, current_user)
+            person_name = await get_person_name(conn, result["data"]["person_id"])
         
-        if entity_type == "staff":
-            result = await approve_staff_onboarding(conn, request_id, current_user)
-            
-            # Send approval notification
-            await notification_service.notify_onboarding_approved(
-                person_id=result["data"]["person_id"],
-                person_name=await get_person_name(conn, result["data"]["person_id"]),
-                staff_id=result["data"]["staff_id"],
-                approved_by=current_user.full_name or current_user.staff_id
-            )
-            
-            return result
-        else:
-            result = await approve_entity_onboarding(conn, request_id, current_user)
-            
-            # Send approval notification for entity
-            await notification_service.notify_onboarding_approved(
-                person_id=result["data"]["person_id"],
-                person_name=await get_person_name(conn, result["data"]["person_id"]),
-                staff_id=result["data"]["staff_id"],
-                approved_by=current_user.full_name or current_user.staff_id
-            )
-            
-            return result
+        # Send approval notification
+        await notification_service.notify_onboarding_approved(
+            person_id=result["data"]["person_id"],
+            person_name=person_name,
+            staff_id=result["data"]["staff_id"],
+            approved_by=current_user.full_name or current_user.staff_id
+        )
+        
+        return result
             
     except HTTPException:
         raise
     except Exception as e:
-        await conn.close()
         raise HTTPException(status_code=500, detail=f"Error approving onboarding request: {str(e)}")
 
 async def get_person_name(conn, person_id: str) -> str:
@@ -366,7 +351,6 @@ async def approve_staff_onboarding(conn, request_id, current_user):
     
     request_data = await conn.fetchrow(request_query, uuid.UUID(request_id))
     if not request_data:
-        await conn.close()
         raise HTTPException(status_code=404, detail="Pending staff onboarding request not found")
     
     # Generate staff ID and create person record
@@ -405,7 +389,6 @@ async def approve_staff_onboarding(conn, request_id, current_user):
     """
     
     await conn.execute(update_query, uuid.UUID(current_user.id), now, uuid.UUID(request_id))
-    await conn.close()
     
     return {
         "success": True,
@@ -428,7 +411,6 @@ async def approve_entity_onboarding(conn, request_id, current_user):
     
     pending_data = await conn.fetchrow(pending_query, uuid.UUID(request_id))
     if not pending_data:
-        await conn.close()
         raise HTTPException(status_code=404, detail="Pending entity onboarding request not found")
     
     data = json.loads(pending_data['data'])
@@ -470,7 +452,6 @@ async def approve_entity_onboarding(conn, request_id, current_user):
     """
     
     await conn.execute(update_query, uuid.UUID(current_user.id), now, uuid.UUID(request_id))
-    await conn.close()
     
     return {
         "success": True,
@@ -483,35 +464,6 @@ async def approve_entity_onboarding(conn, request_id, current_user):
         "message": f"{pending_data['entity_type'].title()} onboarding approved successfully"
     }
 
-async def generate_staff_id(conn, person_type: str) -> str:
-    """Generate unique staff ID based on person type"""
-    prefix_map = {
-        'admin': 'ADM',
-        'harvestflow_manager': 'HFM',
-        'flavorcore_manager': 'FCM', 
-        'flavorcore_supervisor': 'FCS',
-        'supervisor': 'SUP',
-        'harvesting': 'HRV',
-        'staff': 'STF',
-        'supplier': 'SUP',
-        'vendor': 'VND'
-    }
-    
-    prefix = prefix_map.get(person_type, 'EMP')
-    timestamp = datetime.now().strftime("%y%m%d")
-    
-    # Find the next sequence number for this prefix and date
-    sequence_query = """
-    SELECT COUNT(*) as count 
-    FROM person_records 
-    WHERE staff_id LIKE $1
-    """
-    pattern = f"{prefix}-{timestamp}-%"
-    count = await conn.fetchval(sequence_query, pattern)
-    sequence = count + 1
-    
-    return f"{prefix}-{timestamp}-{sequence:04d}"
-
 @router.post("/{request_id}/reject")
 async def reject_onboarding_request(
     request_id: str,
@@ -521,36 +473,35 @@ async def reject_onboarding_request(
 ):
     """Reject an onboarding request"""
     try:
-        conn = await get_db_connection()
-        now = datetime.now()
+        async with get_db_connection() as conn:
+            now = datetime.now()
         
-        if entity_type == "staff":
-            query = """
-            UPDATE onboarding_requests 
-            SET status = 'rejected', approved_by = $1, updated_at = $2
-            WHERE id = $3 AND status = 'pending'
-            """
-            result = await conn.execute(
-                query, 
-                uuid.UUID(current_user.id), 
-                now, 
-                uuid.UUID(request_id)
-            )
-        else:
-            query = """
-            UPDATE onboarding_pending
-            SET status = 'rejected', reviewed_by = $1, reviewed_at = $2, remarks = $3
-            WHERE id = $4 AND status = 'pending'
-            """
-            result = await conn.execute(
-                query, 
-                uuid.UUID(current_user.id), 
-                now, 
-                reason,
-                uuid.UUID(request_id)
-            )
+            if entity_type == "staff":
+                query = """
+                UPDATE onboarding_requests 
+                SET status = 'rejected', approved_by = $1, updated_at = $2
+                WHERE id = $3 AND status = 'pending'
+                """
+                result = await conn.execute(
+                    query, 
+                    uuid.UUID(current_user.id), 
+                    now, 
+                    uuid.UUID(request_id)
+                )
+            else:
+                query = """
+                UPDATE onboarding_pending
+                SET status = 'rejected', reviewed_by = $1, reviewed_at = $2, remarks = $3
+                WHERE id = $4 AND status = 'pending'
+                """
+                result = await conn.execute(
+                    query, 
+                    uuid.UUID(current_user.id), 
+                    now, 
+                    reason,
+                    uuid.UUID(request_id)
+                )
         
-        await conn.close()
         
         if result == "UPDATE 0":
             raise HTTPException(status_code=404, detail="Pending onboarding request not found")
@@ -569,11 +520,8 @@ async def reject_onboarding_request(
         }
         
     except ValueError:
-        await conn.close()
         raise HTTPException(status_code=400, detail="Invalid request ID format")
     except HTTPException:
-        await conn.close()
         raise
     except Exception as e:
-        await conn.close()
         raise HTTPException(status_code=500, detail=f"Error rejecting onboarding request: {str(e)}")
\ No newline at end of file
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import ProvisionRequest, PersonRecord
 from services import NotificationService
-from utils import require_role
+from utils import require_role, UserSnapshot
 from typing import Optional, List
 from datetime import datetime
 import uuid
@@ -18,7 +18,7 @@ async def create_provision_request(
     amount: float = Form(...),
     vendor: Optional[str] = Form(None),
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["harvestflow_manager"]))
+    current_user: UserSnapshot = Depends(require_role(["harvestflow_manager"]))
 ):
     """HarvestFlow Manager creates provision request."""
     
@@ -59,7 +59,7 @@ async def create_provision_request(
 @router.get("/pending")
 async def get_pending_requests(
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["flavorcore_manager", "admin"]))  # ✅ Changed to lowercase
+    current_user: UserSnapshot = Depends(require_role(["flavorcore_manager", "admin"]))  # ✅ Changed to lowercase
 ):
     """Get pending provision requests"""
     
@@ -90,52 +90,7 @@ async def approve_provision_request(
     request_id: str,
     vendor_id: Optional[str] = Form(None),
     db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["admin"]))  # ✅ Changed to lowercase
-):
-    """FlavorCore Manager reviews HarvestFlow provision request"""
-    
-    provision = db.query(ProvisionRequest).filter(
-        ProvisionRequest.id == uuid.UUID(request_id)
-    ).first()
-    
-    if not provision:
-        raise HTTPException(status_code=404, detail="Request not found")
-    
-    if not approved:
-        provision.status = "rejected"
-        db.commit()
-        return {"success": True, "message": "Request rejected"}
-    
-    provision.reviewed_by_fc_manager = current_user.id
-    provision.reviewed_by_fc_manager_at = datetime.utcnow()
-    
-    db.commit()
-    
-    admins = db.query(PersonRecord).filter(
-        PersonRecord.person_type == "admin",
-        PersonRecord.status == "active"
-    ).all()
-    
-    for admin in admins:
-        await notification_service.notify_provision_request(
-            db=db,
-            recipient_id=admin.id,
-            request_type=provision.request_type,
-            amount=float(provision.amount),
-            requester_name="HarvestFlow (via FC Manager)"
-        )
-    
-    return {
-        "success": True,
-        "message": "Request forwarded to Admin for final approval"
-    }
-
-@router.post("/approve/{request_id}")
-async def approve_provision_request(
-    request_id: str,
-    vendor_id: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
-    current_user: PersonRecord = Depends(require_role(["Admin"]))  # ✅ Changed from "admin" to "Admin"
+    current_user: UserSnapshot = Depends(require_role(["Admin"]))  # ✅ Changed from "admin" to "Admin"
 ):
     """Admin gives final approval and assigns to vendor"""
     
@@ -5,7 +5,7 @@ Complete worker management with proper trailing slash handling and correct impor
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_readonly_db
 from models.person import PersonRecord  # FIXED: Changed from models.person_record to models.person
 from typing import List, Optional
 from pydantic import BaseModel
@@ -44,7 +44,7 @@ def get_role_from_staff_id(staff_id: str) -> str:
 
 @router.get("/", response_model=WorkersResponse)
 @router.get("", response_model=WorkersResponse)  # Handle both with and without trailing slash
-async def get_workers(db: Session = Depends(get_db)):
+async def get_workers(db: Session = Depends(get_readonly_db)):
     """Get all workers from the database"""
     try:
         # Query all person records
@@ -67,44 +67,14 @@ async def get_workers(db: Session = Depends(get_db)):
         )
         
     except Exception as e:
-        logging.error(f"Error fetching workers: {str(e)}")
+        logging.error("Error fetching workers: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve workers: {str(e)}"
         )
 
-@router.get("/{staff_id}")
-async def get_worker_by_id(staff_id: str, db: Session = Depends(get_db)):
-    """Get specific worker by staff_id"""
-    try:
-        worker = db.query(PersonRecord).filter(PersonRecord.staff_id == staff_id).first()
-        
-        if not worker:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Worker with staff_id {staff_id} not found"
-            )
-        
-        return {
-            "staff_id": worker.staff_id,
-            "first_name": worker.first_name,
-            "last_name": worker.last_name,
-            "role": get_role_from_staff_id(worker.staff_id),
-            "is_active": True,
-            "created_at": worker.created_at
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"Error getting worker {staff_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve worker: {str(e)}"
-        )
-
 @router.get("/role/{role}")
-async def get_workers_by_role(role: str, db: Session = Depends(get_db)):
+async def get_workers_by_role(role: str, db: Session = Depends(get_readonly_db)):
     """Get workers filtered by role"""
     try:
         # Map role to staff_id prefix
@@ -146,8 +116,38 @@ async def get_workers_by_role(role: str, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error getting workers by role {role}: {str(e)}")
+        logging.error("Error getting workers by role %s: %s", role, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve workers by role: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/{staff_id}")
+async def get_worker_by_id(staff_id: str, db: Session = Depends(get_readonly_db)):
+    """Get specific worker by staff_id"""
+    try:
+        worker = db.query(PersonRecord).filter(PersonRecord.staff_id == staff_id).first()
+        
+        if not worker:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Worker with staff_id {staff_id} not found"
+            )
+        
+        return {
+            "staff_id": worker.staff_id,
+            "first_name": worker.first_name,
+            "last_name": worker.last_name,
+            "role": get_role_from_staff_id(worker.staff_id),
+            "is_active": True,
+            "created_at": worker.created_at
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error("Error getting worker %s: %s", staff_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve worker: {str(e)}"
+        )
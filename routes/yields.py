@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
 from datetime import datetime
 from database import get_db_connection
@@ -15,45 +15,44 @@ async def get_yields(
 ):
     """Get yield data with optional filters"""
     try:
-        conn = await get_db_connection()
+        async with get_db_connection() as conn:
         
-        where_conditions = []
-        params = []
-        param_count = 1
+            where_conditions = []
+            params = []
+            param_count = 1
         
-        if date_from:
-            where_conditions.append(f"date_harvested >= ${param_count}")
-            params.append(date_from)
-            param_count += 1
+            if date_from:
+                where_conditions.append(f"date_harvested >= ${param_count}")
+                params.append(date_from)
+                param_count += 1
         
-        if date_to:
-            where_conditions.append(f"date_harvested <= ${param_count}")
-            params.append(date_to)
-            param_count += 1
+            if date_to:
+                where_conditions.append(f"date_harvested <= ${param_count}")
+                params.append(date_to)
+                param_count += 1
         
-        if lot_id:
-            where_conditions.append(f"lot_id = ${param_count}")
-            params.append(lot_id)
-            param_count += 1
+            if lot_id:
+                where_conditions.append(f"lot_id = ${param_count}")
+                params.append(lot_id)
+                param_count += 1
         
-        where_clause = f"WHERE {' AND '.join(where_conditions)}" if where_conditions else ""
+            where_clause = f"WHERE {' AND '.join(where_conditions)}" if where_conditions else ""
         
-        query = f"""
-        SELECT 
-            lot_id,
-            crop,
-            raw_weight,
-            threshed_weight,
-            estate_yield_pct,
-            date_harvested,
-            created_by
-        FROM lots
-        {where_clause}
-        ORDER BY date_harvested DESC
-        """
+            query = f"""
+            SELECT 
+                lot_id,
+                crop,
+                raw_weight,
+                threshed_weight,
+                estate_yield_pct,
+                date_harvested,
+                created_by
+            FROM lots
+            {where_clause}
+            ORDER BY date_harvested DESC
+            """
         
-        rows = await conn.fetch(query, *params)
-        await conn.close()
+            rows = await conn.fetch(query, *params)
         
         yields = []
         for row in rows:
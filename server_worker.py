@@ -0,0 +1,24 @@
+"""
+RelishAgro Backend - Gunicorn worker class
+UvicornWorker only forwards a fixed set of gunicorn settings to uvicorn, so
+server options such as the concurrency cap are pinned here instead.
+"""
+
+import os
+from uvicorn.workers import UvicornWorker
+
+# Requests in flight per worker before uvicorn answers 503 instead of queueing
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "1000"))
+
+class RelishAgroWorker(UvicornWorker):
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        # Fail loudly if uvicorn[standard] extras are missing instead of
+        # silently falling back to asyncio + h11
+        "loop": "uvloop",
+        "http": "httptools",
+        "limit_concurrency": LIMIT_CONCURRENCY,
+        # The worker hands uvicorn.access gunicorn's handlers, which still
+        # propagate to the root logger; skip building access records at all
+        "access_log": False,
+    }
@@ -1,9 +1,9 @@
 import numpy as np
 import cv2
 import json
-from typing import Optional, Tuple
+from typing import Any, Iterable, Optional, Tuple
 from pathlib import Path
-from config import settings
+from config import FACE_STORAGE_PATH
 
 class FaceRecognitionService:
     """
@@ -27,7 +27,7 @@ class FaceRecognitionService:
                 raise Exception("Failed to load Haar cascade")
             
             # Ensure storage directory exists
-            Path(settings.FACE_STORAGE_PATH).mkdir(parents=True, exist_ok=True)
+            Path(FACE_STORAGE_PATH).mkdir(parents=True, exist_ok=True)
             
             self.available = True
             print("✅ Face Recognition Service initialized (Lightweight mode)")
@@ -104,6 +104,44 @@ class FaceRecognitionService:
             print(f"❌ Embedding extraction error: {e}")
             return None
     
+    def decode_and_embed(self, image_bytes: bytes) -> Tuple[Optional[np.ndarray], Optional[list]]:
+        """
+        Decode an encoded image and extract its face embedding.
+        CPU-bound; call via asyncio.to_thread from request handlers.
+        Returns: (image, embedding); image is None if undecodable,
+        embedding is None if no face was found
+        """
+        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return None, None
+        return img, self.extract_embedding(img)
+    
+    def find_best_match(
+        self,
+        query_embedding: list,
+        candidates: Iterable[Tuple[Any, list]],
+        threshold: float
+    ) -> Tuple[Optional[Any], float]:
+        """
+        Compare a query embedding against (candidate, embedding) pairs.
+        CPU-bound; call via asyncio.to_thread from request handlers.
+        Returns: (best candidate at or above threshold or None, its similarity)
+        """
+        best_match = None
+        best_similarity = 0.0
+        
+        for candidate, embedding in candidates:
+            if embedding is None:
+                continue
+            
+            similarity = self.compare_embeddings(query_embedding, embedding)
+            
+            if similarity > best_similarity and similarity >= threshold:
+                best_similarity = similarity
+                best_match = candidate
+        
+        return best_match, best_similarity
+    
     def compare_embeddings(self, embedding1: list, embedding2: list) -> float:
         """
         Compare two face embeddings using histogram correlation.
@@ -139,7 +177,7 @@ class FaceRecognitionService:
             from datetime import datetime
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             filename = f"{person_id}_{timestamp}.jpg"
-            filepath = Path(settings.FACE_STORAGE_PATH) / filename
+            filepath = Path(FACE_STORAGE_PATH) / filename
             
             cv2.imwrite(str(filepath), image_data)
             return str(filepath)
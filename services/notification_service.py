@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from models import Notification, PersonRecord
@@ -7,6 +8,9 @@ from datetime import datetime, date  # ADDED 'date' import here
 from database import get_db_connection
 import asyncpg
 
+# Twilio sends allowed in flight at once per worker
+EXTERNAL_SEND_CONCURRENCY = 4
+
 class NotificationService:
     """
     Enhanced Multi-channel notification service: In-app, SMS, WhatsApp
@@ -14,15 +18,24 @@ class NotificationService:
     """
     
     def __init__(self):
-        self.twilio_client = None
-        self._initialize_twilio()
+        self._twilio_client = None
+        self._twilio_initialized = False
+        self._send_slots = asyncio.Semaphore(EXTERNAL_SEND_CONCURRENCY)
+    
+    @property
+    def twilio_client(self):
+        """Twilio client, created on first use so importing this module reads no Twilio settings"""
+        if not self._twilio_initialized:
+            self._twilio_initialized = True
+            self._initialize_twilio()
+        return self._twilio_client
     
     def _initialize_twilio(self):
         """Initialize Twilio client for SMS/WhatsApp"""
         try:
             if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
                 from twilio.rest import Client
-                self.twilio_client = Client(
+                self._twilio_client = Client(
                     settings.TWILIO_ACCOUNT_SID,
                     settings.TWILIO_AUTH_TOKEN
                 )
@@ -131,86 +144,90 @@ class NotificationService:
     ):
         """Send system notification to specified users or roles"""
         try:
-            conn = await get_db_connection()
+            async with get_db_connection() as conn:
             
-            # Get target user IDs based on roles
-            user_ids = []
-            if target_roles:
-                role_query = """
-                SELECT id FROM person_records 
-                WHERE person_type = ANY($1) AND status = 'active'
-                """
-                role_users = await conn.fetch(role_query, target_roles)
-                user_ids.extend([str(row['id']) for row in role_users])
+                # Get target user IDs based on roles
+                user_ids = []
+                if target_roles:
+                    role_query = """
+                    SELECT id FROM person_records 
+                    WHERE person_type = ANY($1) AND status = 'active'
+                    """
+                    role_users = await conn.fetch(role_query, target_roles)
+                    user_ids.extend([str(row['id']) for row in role_users])
             
-            # Add specific target users
-            if target_users:
-                user_ids.extend(target_users)
+                # Add specific target users
+                if target_users:
+                    user_ids.extend(target_users)
             
-            # Remove duplicates
-            user_ids = list(set(user_ids))
+                # Remove duplicates
+                user_ids = list(set(user_ids))
             
-            # Create notifications for each user
-            for user_id in user_ids:
+                # Create notifications for all users in one batched round-trip
                 query = """
                 INSERT INTO notifications (
                     recipient_id, title, message, notification_type, 
                     data, created_at, is_read, is_system
                 ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                RETURNING id
                 """
-                
+            
                 notification_data = {
                     "action_url": action_url,
                     "system_notification": True
                 }
-                
-                notification_id = await conn.fetchval(
-                    query,
-                    uuid.UUID(user_id),
-                    title,
-                    message,
-                    notification_type,
-                    notification_data,
-                    datetime.now(),
-                    False,
-                    True
-                )
-                
-                # Send SMS/WhatsApp if requested
-                if send_sms or send_whatsapp:
-                    await self._send_external_notifications(
-                        conn, user_id, message, send_sms, send_whatsapp
+                now = datetime.now()
+            
+                await conn.executemany(query, [
+                    (
+                        uuid.UUID(user_id),
+                        title,
+                        message,
+                        notification_type,
+                        notification_data,
+                        now,
+                        False,
+                        True
                     )
+                    for user_id in user_ids
+                ])
+            
+                # One contact lookup for SMS/WhatsApp recipients
+                contacts = []
+                if (send_sms or send_whatsapp) and self.twilio_client and user_ids:
+                    contacts = await conn.fetch(
+                        "SELECT contact_number FROM person_records WHERE id = ANY($1)",
+                        [uuid.UUID(user_id) for user_id in user_ids]
+                    )
+            
+            # Twilio calls run after the pool connection is released, so a
+            # slow provider can't hold DB connections
+            await asyncio.gather(*[
+                self._send_external_notifications(
+                    row['contact_number'], message, send_sms, send_whatsapp
+                )
+                for row in contacts
+                if row['contact_number']
+            ])
             
-            await conn.close()
             return True
             
         except Exception as e:
             print(f"Error sending system notification: {str(e)}")
             return False
     
-    async def _send_external_notifications(self, conn, user_id: str, message: str, send_sms: bool, send_whatsapp: bool):
-        """Send SMS/WhatsApp notifications"""
+    async def _send_external_notifications(self, phone_number: str, message: str, send_sms: bool, send_whatsapp: bool):
+        """Send SMS/WhatsApp notifications; the blocking Twilio client runs in a worker thread"""
         try:
-            # Get user contact details
-            user_query = """
-            SELECT contact_number FROM person_records WHERE id = $1
-            """
-            user = await conn.fetchrow(user_query, uuid.UUID(user_id))
-            
-            if not user or not user['contact_number']:
-                return
-            
-            phone_number = user['contact_number']
-            
-            # Send SMS
-            if send_sms and self.twilio_client:
-                self._send_sms(phone_number, message)
-            
-            # Send WhatsApp
-            if send_whatsapp and self.twilio_client:
-                self._send_whatsapp(phone_number, message)
+            # Bounded: to_thread shares the default executor with face
+            # matching, DB probes and sync routes
+            async with self._send_slots:
+                # Send SMS
+                if send_sms and self.twilio_client:
+                    await asyncio.to_thread(self._send_sms, phone_number, message)
+                
+                # Send WhatsApp
+                if send_whatsapp and self.twilio_client:
+                    await asyncio.to_thread(self._send_whatsapp, phone_number, message)
                 
         except Exception as e:
             print(f"Error sending external notifications: {str(e)}")
@@ -1,4 +1,4 @@
-from .permissions import require_role, get_current_user
+from .permissions import require_role, get_current_user, invalidate_user, UserSnapshot
 from .offline_sync import OfflineSyncQueue
 
-__all__ = ["require_role", "get_current_user", "OfflineSyncQueue"]
\ No newline at end of file
+__all__ = ["require_role", "get_current_user", "invalidate_user", "UserSnapshot", "OfflineSyncQueue"]
\ No newline at end of file
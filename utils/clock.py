@@ -0,0 +1,24 @@
+"""
+Cached wall-clock timestamp for status endpoints
+"""
+
+import time
+from datetime import datetime, timezone
+
+# Seconds a rendered timestamp is reused before being formatted again
+_TTL = 0.5
+
+_cached_at = 0.0
+_cached_iso = ""
+
+def now_iso() -> str:
+    """
+    Current UTC time as a naive ISO-8601 string (datetime.utcnow().isoformat()
+    format, no offset), re-rendered at most every _TTL seconds
+    """
+    global _cached_at, _cached_iso
+    now = time.time()
+    if now - _cached_at > _TTL:
+        _cached_iso = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+        _cached_at = now
+    return _cached_iso
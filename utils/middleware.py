@@ -0,0 +1,115 @@
+"""
+Pure ASGI middlewares (no BaseHTTPMiddleware Request/Response wrapping)
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Iterable, MutableMapping, Tuple
+
+Scope = MutableMapping[str, Any]
+ASGIApp = Callable[[Scope, Callable, Callable], Awaitable[None]]
+
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+_TEXT_PLAIN = b"text/plain"
+_JSON_CONTENT_TYPE = (b"content-type", b"application/json")
+
+class PlainTextJSONMiddleware:
+    """
+    Treat text/plain request bodies as JSON on the given paths only.
+
+    Browsers send POSTs with Content-Type: text/plain as CORS "simple"
+    requests without an OPTIONS preflight, so the mobile frontend can post
+    JSON that way and save a round-trip. That also lets any cross-origin
+    page reach the handler unpreflighted, so it is limited to
+    unauthenticated endpoints such as login; everything else sends
+    Authorization and is preflighted anyway. The header is rewritten in the
+    ASGI scope before routing; the body itself is passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["method"] in _BODY_METHODS
+            and scope["path"] in self.paths
+        ):
+            headers = scope["headers"]
+            for i, (name, value) in enumerate(headers):
+                if name == b"content-type":
+                    if value.split(b";", 1)[0].strip().lower() == _TEXT_PLAIN:
+                        headers = list(headers)
+                        headers[i] = _JSON_CONTENT_TYPE
+                        scope = dict(scope, headers=headers)
+                    break
+        await self.app(scope, receive, send)
+
+_PROBE_METHODS = frozenset({"GET", "HEAD"})
+
+class HealthCheckMiddleware:
+    """
+    Answer GET/HEAD on one path straight from the ASGI layer.
+
+    Load balancer probes never reach routing, the exception middleware or
+    a Response object; render() returns the JSON body bytes per hit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path: str,
+        render: Callable[[], bytes],
+        headers: Iterable[Tuple[bytes, bytes]] = (),
+    ):
+        self.app = app
+        self.path = path
+        self.render = render
+        self.headers = [(b"content-type", b"application/json"), *headers]
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"] != self.path
+            or scope["method"] not in _PROBE_METHODS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = self.render()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [*self.headers, (b"content-length", str(len(body)).encode())],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": b"" if scope["method"] == "HEAD" else body,
+        })
+
+class TimingMiddleware:
+    """
+    Stamp each response with X-Response-Time: time from request arrival
+    to the response start message, measured with perf_counter_ns.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+
+        async def send_with_timing(message: MutableMapping[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-response-time", f"{elapsed_ms:.2f}ms".encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
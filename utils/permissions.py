@@ -1,9 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, SessionLocal
 from models import PersonRecord
-from typing import List
+from cachetools import TTLCache
+from dataclasses import dataclass
+from typing import List, Optional
+import threading
+import uuid
 import jwt
 
 security = HTTPBearer()
@@ -57,37 +61,10 @@ ROLE_MAPPING = {
     "Driver": "driver"
 }
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> PersonRecord:
-    """
-    Get current authenticated user from JWT token.
-    """
+def _staff_id_from_token(credentials: HTTPAuthorizationCredentials) -> str:
+    """Decode the bearer JWT and return its subject (staff_id)"""
     try:
-        # Decode JWT token
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        staff_id = payload.get("sub")
-        
-        if staff_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials"
-            )
-        
-        user = db.query(PersonRecord).filter(
-            PersonRecord.staff_id == staff_id
-        ).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        return user
-        
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -103,6 +80,87 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication failed"
         )
+    
+    staff_id = payload.get("sub")
+    if staff_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+    return staff_id
+
+def _load_user(db: Session, staff_id: str) -> PersonRecord:
+    try:
+        user = db.query(PersonRecord).filter(
+            PersonRecord.staff_id == staff_id
+        ).first()
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication failed"
+        )
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
+    return user
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> PersonRecord:
+    """
+    Get current authenticated user from JWT token.
+    """
+    return _load_user(db, _staff_id_from_token(credentials))
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The PersonRecord fields role-guarded routes read from current_user"""
+    id: uuid.UUID
+    staff_id: str
+    full_name: Optional[str]
+    person_type: str
+
+# staff_id -> UserSnapshot, per worker process. Role or name changes reach
+# guarded routes within the TTL, or at once on the worker that handled the
+# change via invalidate_user()
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+# TTLCache is not thread-safe and sync admin routes invalidate from the threadpool
+_user_cache_lock = threading.Lock()
+
+def invalidate_user(staff_id: str) -> None:
+    """Drop a cached user so the next guarded request reloads it"""
+    with _user_cache_lock:
+        _user_cache.pop(staff_id, None)
+
+async def get_current_user_snapshot(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UserSnapshot:
+    """
+    Like get_current_user, but served from a short-lived cache so
+    role-guarded requests skip the person_records lookup. A Session is
+    only opened on a cache miss.
+    """
+    staff_id = _staff_id_from_token(credentials)
+    
+    with _user_cache_lock:
+        snapshot = _user_cache.get(staff_id)
+    if snapshot is None:
+        with SessionLocal() as db:
+            user = _load_user(db, staff_id)
+            snapshot = UserSnapshot(
+                id=user.id,
+                staff_id=user.staff_id,
+                full_name=user.full_name,
+                person_type=user.person_type
+            )
+        with _user_cache_lock:
+            _user_cache[staff_id] = snapshot
+    return snapshot
 
 def require_role(allowed_roles: List[str]):
     """
@@ -110,19 +168,15 @@ def require_role(allowed_roles: List[str]):
     Handles both capitalized JWT roles and lowercase database person_types.
     Usage: require_role(["admin", "Admin", "harvestflow_manager"])
     """
+    # Normalize allowed roles once, when the dependency is declared:
+    # capitalized JWT roles map through ROLE_MAPPING, person_types lowercase
+    normalized_allowed_roles = frozenset(
+        ROLE_MAPPING.get(role, role.lower()) for role in allowed_roles
+    )
+    
     async def role_checker(
-        current_user: PersonRecord = Depends(get_current_user)
-    ) -> PersonRecord:
-        # Normalize allowed roles to lowercase
-        normalized_allowed_roles = []
-        for role in allowed_roles:
-            # If role is in ROLE_MAPPING (capitalized), convert to person_type
-            if role in ROLE_MAPPING:
-                normalized_allowed_roles.append(ROLE_MAPPING[role])
-            else:
-                # Already lowercase person_type format
-                normalized_allowed_roles.append(role.lower())
-        
+        current_user: UserSnapshot = Depends(get_current_user_snapshot)
+    ) -> UserSnapshot:
         # Check if user's person_type matches any allowed role
         if current_user.person_type not in normalized_allowed_roles:
             raise HTTPException(
@@ -0,0 +1,74 @@
+"""
+Staff ID generation backed by a per-prefix, per-day counter row
+"""
+
+import asyncpg
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+STAFF_ID_PREFIXES = {
+    'admin': 'ADM',
+    'harvestflow_manager': 'HFM',
+    'flavorcore_manager': 'FCM',
+    'flavorcore_supervisor': 'FCS',
+    'supervisor': 'SUP',
+    'harvesting': 'HRV',
+    'staff': 'STF',
+    'supplier': 'SUP',
+    'vendor': 'VND'
+}
+
+_BUMP_COUNTER = """
+UPDATE staff_id_counters SET last_n = last_n + 1
+WHERE key = $1
+RETURNING last_n
+"""
+
+# First ID for a prefix/day: seed from IDs issued before the counter existed
+_SEED_COUNTER = """
+INSERT INTO staff_id_counters (key, last_n)
+VALUES ($1, (SELECT COUNT(*) FROM person_records WHERE staff_id LIKE $1 || '-%') + 1)
+ON CONFLICT (key) DO UPDATE SET last_n = staff_id_counters.last_n + 1
+RETURNING last_n
+"""
+
+# Pre-counter behaviour, used only while staff_id_counters does not exist
+_COUNT_ISSUED = """
+SELECT COUNT(*) FROM person_records WHERE staff_id LIKE $1 || '-%'
+"""
+
+def ensure_staff_id_counters():
+    """
+    Create staff_id_counters if it is missing. Runs at every startup when
+    RUN_DDL is off; a failure (e.g. no CREATE rights) is logged and
+    generate_staff_id falls back to counting person_records.
+    """
+    from database import engine
+    from models import StaffIdCounter
+    try:
+        StaffIdCounter.__table__.create(bind=engine, checkfirst=True)
+    except Exception as e:
+        logger.warning("⚠️ Could not create staff_id_counters: %s", e)
+
+async def generate_staff_id(conn: asyncpg.Connection, person_type: str) -> str:
+    """
+    Generate a unique staff ID such as STF-250101-0001.
+    The counter row is bumped atomically, so concurrent approvals never
+    receive the same sequence number and no COUNT scan runs per call.
+    The staff_id_counters table is models.StaffIdCounter, created by
+    init_db() or ensure_staff_id_counters() at startup.
+    """
+    key = f"{STAFF_ID_PREFIXES.get(person_type, 'EMP')}-{datetime.now().strftime('%y%m%d')}"
+    try:
+        # Savepoint, so a missing table doesn't abort the caller's transaction
+        async with conn.transaction():
+            sequence = await conn.fetchval(_BUMP_COUNTER, key)
+            if sequence is None:
+                sequence = await conn.fetchval(_SEED_COUNTER, key)
+    except asyncpg.UndefinedTableError:
+        logger.warning("⚠️ staff_id_counters missing, counting person_records instead")
+        sequence = await conn.fetchval(_COUNT_ISSUED, key) + 1
+
+    return f"{key}-{sequence:04d}"